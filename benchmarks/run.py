@@ -0,0 +1,268 @@
+"""Benchmarks for the pairing, standings, persistence and export hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run                    # run and print every case
+    python -m benchmarks.run --save-baseline    # record benchmarks/baseline.json
+    python -m benchmarks.run --compare          # exit 1 on a regression
+
+Every case is built from a synthetic tournament, parameterized by players
+x rounds and seeded, so runs are reproducible. Wall time is the best of
+--repeat runs; peak memory comes from one extra run under tracemalloc. Only
+the standard library, numpy, pandas and openpyxl are needed, and nothing
+touches the network.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from croquet import storage
+from croquet.engine import build_standings, generate_pairings, replay_matches, score_round
+from croquet.players import PlayerStore
+from croquet.simulate import play_match
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SIZES = [(16, 5), (64, 7), (200, 9), (400, 10)]
+QUICK_SIZES = [(16, 5), (64, 7)]
+
+
+def synthetic_tournament(num_players, num_rounds, seed=0):
+    """Play num_rounds rounds and return (names, rounds).
+
+    rounds holds one (matches, byes, standings) triple per round, in order.
+    """
+    rng = np.random.default_rng(seed)
+    strengths = rng.normal(0.0, 1.0, num_players)
+    players = PlayerStore([f"Player {i:03d}" for i in range(num_players)])
+    rounds = []
+    for round_num in range(1, num_rounds + 1):
+        pairings, byes, _ = generate_pairings(players, modifying=False)
+        results = {
+            (p1, p2): play_match(rng, strengths[players.index[p1]], strengths[players.index[p2]])
+            for p1, p2 in pairings
+        }
+        matches = score_round(players, round_num, pairings, results)
+        rounds.append((matches, byes, build_standings(players)))
+    return players.names, rounds
+
+
+def _all_matches(rounds):
+    return [m for matches, _, _ in rounds for m in matches]
+
+
+def _players_before_last_round(names, rounds):
+    players = PlayerStore(names)
+    played = _all_matches(rounds[:-1])
+    replay_matches(players, played)
+    players.record_matches(played)
+    return players
+
+
+def _store(conn, names, rounds):
+    tournament_id = storage.create_tournament(conn, "Benchmark", "2024-01-01T00:00:00", len(rounds), names)
+    for round_num, (matches, byes, standings) in enumerate(rounds, 1):
+        storage.record_round(conn, tournament_id, round_num, matches, byes, standings)
+    return tournament_id
+
+
+def case_pairing(names, rounds, workdir):
+    """generate_pairings for the final round of a played-out field."""
+    players = _players_before_last_round(names, rounds)
+    return lambda: generate_pairings(players, modifying=False)
+
+
+def case_standings(names, rounds, workdir):
+    """The 'Update Standings' rebuild: replay every match and rank."""
+    players = PlayerStore(names)
+    matches = _all_matches(rounds)
+    players.record_matches(matches)
+
+    def run():
+        replay_matches(players, matches)
+        return build_standings(players)
+    return run
+
+
+def case_persist(names, rounds, workdir):
+    """Create a tournament and record every round in a fresh database."""
+    path = os.path.join(workdir, 'persist.db')
+
+    def run():
+        if os.path.exists(path):
+            os.remove(path)
+        conn = storage.connect(path)
+        storage.init_db(conn)
+        _store(conn, names, rounds)
+        conn.close()
+    return run
+
+
+def case_load(names, rounds, workdir):
+    """Load tournament, matches, standings and players as the app does."""
+    conn = storage.connect(os.path.join(workdir, 'load.db'))
+    storage.init_db(conn)
+    tournament_id = _store(conn, names, rounds)
+
+    def run():
+        with storage.read_snapshot(conn):
+            storage.load_tournament(conn, tournament_id)
+            matches = storage.load_matches(conn, tournament_id)
+            return storage.load_players(conn, tournament_id, matches)
+    return run
+
+
+def case_backup(names, rounds, workdir):
+    """export_state/import_state round trip through the default codec."""
+    conn = storage.connect(os.path.join(workdir, 'backup.db'))
+    storage.init_db(conn)
+    tournament_id = _store(conn, names, rounds)
+
+    def run():
+        new_id = storage.import_state(conn, storage.export_state(conn, tournament_id))
+        storage.delete_tournament(conn, new_id)
+    return run
+
+
+def case_edit(names, rounds, workdir):
+    """Save Round Results for one changed score in the last round."""
+    conn = storage.connect(os.path.join(workdir, 'edit.db'))
+    storage.init_db(conn)
+    tournament_id = _store(conn, names, rounds)
+    match = dict(rounds[-1][0][0])
+    loser = 'score2' if match['score1'] == 7 else 'score1'
+    toggle = [match[loser], (match[loser] + 1) % 7]
+
+    def run():
+        toggle.reverse()
+        match[loser] = toggle[0]
+        storage.edit_results(conn, tournament_id, [match])
+    return run
+
+
+def case_xlsx(names, rounds, workdir):
+    """Standings plus cross-table XLSX export."""
+    import pandas as pd
+
+    from croquet.export import cross_table, standings_xlsx
+
+    matches = _all_matches(rounds)
+    df_s = pd.DataFrame(rounds[-1][2])
+
+    def run():
+        return standings_xlsx(df_s, cross_table(names, matches))
+    return run
+
+
+CASES = {
+    'pairing': case_pairing,
+    'standings': case_standings,
+    'persist': case_persist,
+    'load': case_load,
+    'backup': case_backup,
+    'edit': case_edit,
+    'xlsx': case_xlsx,
+}
+
+
+def measure(fn, repeat):
+    """Return (best wall seconds over repeat runs, peak traced bytes of one run)."""
+    fn()  # warm-up
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_suite(sizes, cases, repeat, seed=0):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for num_players, num_rounds in sizes:
+            names, rounds = synthetic_tournament(num_players, num_rounds, seed)
+            for case in cases:
+                key = f"{case}[{num_players}x{num_rounds}]"
+                seconds, peak = measure(CASES[case](names, rounds, workdir), repeat)
+                results[key] = {'seconds': round(seconds, 6), 'peak_bytes': peak}
+                print(f"{key:<24} {seconds * 1000:10.2f} ms {peak / 1024:12.1f} KiB", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    """Return one message per case slower or hungrier than baseline allows."""
+    regressions = []
+    for key, now in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        limit = before['seconds'] * (1 + tolerance)
+        if now['seconds'] > limit and now['seconds'] - before['seconds'] > min_seconds:
+            regressions.append(
+                f"{key}: {now['seconds'] * 1000:.2f} ms vs baseline {before['seconds'] * 1000:.2f} ms"
+            )
+        if now['peak_bytes'] > before['peak_bytes'] * (1 + tolerance):
+            regressions.append(
+                f"{key}: peak {now['peak_bytes'] / 1024:.1f} KiB vs baseline {before['peak_bytes'] / 1024:.1f} KiB"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks.run', description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="small field sizes only")
+    parser.add_argument('--size', action='append', metavar='PLAYERSxROUNDS',
+                        help="field size to run, e.g. 100x7 (repeatable)")
+    parser.add_argument('--case', action='append', choices=sorted(CASES), help="case to run (repeatable)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown fraction (default: 0.25)")
+    parser.add_argument('--min-seconds', type=float, default=0.001,
+                        help="ignore time regressions smaller than this (default: 0.001)")
+    args = parser.parse_args(argv)
+
+    if args.size:
+        sizes = [tuple(int(v) for v in s.lower().split('x')) for s in args.size]
+    else:
+        sizes = QUICK_SIZES if args.quick else SIZES
+    results = run_suite(sizes, args.case or list(CASES), args.repeat, args.seed)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'sqlite': sqlite3.sqlite_version,
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}.")
+
+    if args.compare:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == '__main__':
+    main()
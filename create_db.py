@@ -1,21 +1,11 @@
-import sqlite3
+from croquet import storage
 
 def create_db():
-    conn = sqlite3.connect('tournaments.db')
+    conn = storage.connect()
     c = conn.cursor()
-    c.execute('DROP TABLE IF EXISTS tournaments')
-    c.execute('''CREATE TABLE tournaments
-                 (id INTEGER PRIMARY KEY, 
-                  name TEXT, 
-                  created_date TEXT,
-                  players TEXT, 
-                  num_rounds INTEGER, 
-                  current_round INTEGER DEFAULT 1,
-                  matches TEXT, 
-                  standings TEXT, 
-                  byes TEXT, 
-                  pairing_method TEXT)''')
-    conn.commit()
+    for table in ('standings', 'byes', 'matches', 'players', 'tournaments'):
+        c.execute(f'DROP TABLE IF EXISTS {table}')
+    storage.init_db(conn)
     conn.close()
     print("Database 'tournaments.db' created successfully.")
 
@@ -0,0 +1,27 @@
+"""Headless core of the Croquet Tournament Manager.
+
+The Streamlit app and the command line (``python -m croquet``) are thin
+front ends over these modules; importing the package needs neither
+Streamlit nor openpyxl.
+"""
+from .engine import (
+    build_standings,
+    generate_pairings,
+    match_winner,
+    replay_matches,
+    score_round,
+    search_pairings,
+    sort_key,
+)
+from .players import PlayerStore
+
+__all__ = [
+    'PlayerStore',
+    'build_standings',
+    'generate_pairings',
+    'match_winner',
+    'replay_matches',
+    'score_round',
+    'search_pairings',
+    'sort_key',
+]
@@ -0,0 +1,195 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from . import storage
+
+
+class TournamentCache:
+    """Process-wide read cache for the tournament list and tournament loads.
+
+    Entries are keyed by the version counters that every write path bumps,
+    so a rerun costs one small version query when nothing has changed and
+    the entry is reloaded exactly when it has. With migrate=False legacy
+    rows are not converted on load, for callers holding a read-only
+    connection; they must check storage.needs_migration first.
+    """
+
+    def __init__(self, migrate=True):
+        self.migrate = migrate
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._tournaments = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def tournament_list(self, conn):
+        version = storage.catalog_version(conn)
+        entry = self._catalog
+        if entry is not None and entry[0] == version:
+            self._count(True)
+            return entry[1]
+        self._count(False)
+        with storage.read_snapshot(conn):
+            version = storage.catalog_version(conn)
+            rows = storage.list_tournaments(conn)
+        self._catalog = (version, rows)
+        return rows
+
+    def tournament(self, conn, tournament_id):
+        """Return the cached state of a tournament, or None if it is gone.
+
+        The result is shared between sessions and must not be mutated; use
+        players() for per-rerun player dicts.
+        """
+        version = storage.tournament_version(conn, tournament_id)
+        if version is None:
+            self._tournaments.pop(tournament_id, None)
+            return None
+        entry = self._tournaments.get(tournament_id)
+        if entry is not None and entry['version'] == version:
+            self._count(True)
+            return entry
+        self._count(False)
+        if self.migrate:
+            storage.migrate_legacy(conn, tournament_id)
+        with storage.read_snapshot(conn):
+            tourney = storage.load_tournament(conn, tournament_id, migrate=False)
+            if tourney is None:
+                return None
+            entry = {
+                'version': storage.tournament_version(conn, tournament_id),
+                'tournament': tourney,
+                'player_names': storage.load_player_names(conn, tournament_id),
+                'matches': storage.load_matches(conn, tournament_id),
+                'standings': storage.load_standings(conn, tournament_id),
+                'standings_round': storage.latest_standings_round(conn, tournament_id),
+                'pairings': storage.load_pairings(conn, tournament_id, tourney['current_round']),
+                'results': storage.load_board_results(conn, tournament_id, tourney['current_round']),
+            }
+        self._tournaments[tournament_id] = entry
+        return entry
+
+    def discard(self, tournament_id):
+        """Forget a tournament, e.g. after deleting it."""
+        self._tournaments.pop(tournament_id, None)
+
+    @staticmethod
+    def players(entry):
+        return storage.build_players(
+            entry['player_names'], entry['standings'], entry['matches'], entry['tournament']['tiebreaks']
+        )
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'tournaments': len(self._tournaments)}
+
+
+class ExportCache:
+    """Size-bounded LRU cache of generated export files.
+
+    Entries are keyed by tournament id, tournament version and format, so a
+    repeat download of unchanged results is served from memory, and any
+    write, which bumps the version, replaces the old entry. When a
+    directory is given, files are also kept there under a hash of the key
+    and survive restarts; the older versions of a file are removed when a
+    newer one is stored.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tournament_id, version, fmt, build):
+        """Return the export bytes for this state, calling build() only on a miss."""
+        key = (tournament_id, version, fmt)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data = self._read(key)
+        hit = data is not None
+        if not hit:
+            data = build()
+            self._write(key, data)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if key not in self._entries and len(data) <= self.max_bytes:
+                # Older versions of the same file can never be asked for again.
+                for old in [k for k in self._entries if k[0] == tournament_id and k[2] == fmt]:
+                    self._size -= len(self._entries.pop(old))
+                self._entries[key] = data
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return data
+
+    def _path(self, key):
+        tournament_id, version, fmt = key
+        digest = hashlib.sha256(f"{tournament_id}:{version}:{fmt}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f"{tournament_id}-{fmt}-{digest}.{fmt}")
+
+    def _read(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key, data):
+        if not self.directory:
+            return
+        path = self._path(key)
+        prefix = f"{key[0]}-{key[2]}-"
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and os.path.join(self.directory, name) != path:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+        # Written under a temporary name and renamed, so readers never see half a file.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def discard(self, tournament_id):
+        """Drop every cached file of a tournament, in memory and on disk."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == tournament_id]:
+                self._size -= len(self._entries.pop(key))
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.startswith(f"{tournament_id}-"):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except FileNotFoundError:
+                        pass
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'bytes': self._size}
@@ -0,0 +1,324 @@
+"""Command-line front end: ``python -m croquet --help``."""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from . import storage
+from .engine import build_standings, score_round
+from .ranking import TIEBREAKS, parse_chain
+
+STANDINGS_HEADER = ('rank', 'name', 'games_played', 'wins', 'losses', 'net_hoops', 'points')
+
+
+def _open(args):
+    conn = storage.connect(args.db)
+    storage.init_db(conn)
+    return conn
+
+
+def _load(conn, tournament_id):
+    tourney = storage.load_tournament(conn, tournament_id)
+    if tourney is None:
+        raise SystemExit(f"Tournament {tournament_id} not found.")
+    return tourney, storage.load_players(conn, tournament_id)
+
+
+def _current_pairings(conn, tourney, players, repair=False, time_budget=None):
+    if tourney['current_round'] > tourney['num_rounds']:
+        raise SystemExit(f"Tournament '{tourney['name']}' is complete.")
+    if repair:
+        return storage.repair_round(conn, tourney['id'], players, tourney['current_round'], time_budget)
+    return storage.ensure_pairings(conn, tourney['id'], players, tourney['current_round'], time_budget)
+
+
+def _parse_score(text):
+    try:
+        s1, s2 = text.split('-')
+        return int(s1), int(s2)
+    except ValueError:
+        raise SystemExit(f"Invalid score '{text}': expected e.g. 7-3.") from None
+
+
+def cmd_init_db(args, conn):
+    print(f"Database '{args.db}' is ready.")
+
+
+def cmd_migrate(args, conn):
+    converted = storage.migrate_legacy(conn)
+    print(f"Migrated {converted} tournament(s) in '{args.db}' to the relational schema.")
+
+
+def cmd_list(args, conn):
+    for tournament_id, name, created_date in storage.list_tournaments(conn):
+        print(f"{tournament_id}\t{name}\t{created_date}")
+
+
+def cmd_create(args, conn):
+    names = list(args.players)
+    if args.players_file:
+        with open(args.players_file, encoding='utf-8') as f:
+            names.extend(line.strip() for line in f if line.strip())
+    if len(names) < 2:
+        raise SystemExit("At least two players are required.")
+    if len(set(names)) < len(names):
+        raise SystemExit("Player names must be unique.")
+    try:
+        tiebreaks = parse_chain(args.tiebreaks)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    tournament_id = storage.create_tournament(
+        conn, args.name, datetime.now().isoformat(), args.rounds, names, tiebreaks
+    )
+    print(f"Created tournament {tournament_id} '{args.name}' with {len(names)} players.")
+
+
+def cmd_import(args, conn):
+    from .importer import import_files
+
+    if not args.results and not args.players:
+        raise SystemExit("Give --results and/or --players.")
+    try:
+        ids = import_files(conn, results=args.results, players=args.players, name=args.name, num_rounds=args.rounds)
+    except (ValueError, OSError) as exc:
+        raise SystemExit(str(exc)) from None
+    print(f"Imported {len(ids)} tournament(s): {', '.join(map(str, ids))}.")
+
+
+def cmd_pair(args, conn):
+    tourney, players = _load(conn, args.tournament)
+    try:
+        pairings, byes, has_repeat = _current_pairings(conn, tourney, players, args.repair, args.time_budget)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    results = storage.load_board_results(conn, tourney['id'], tourney['current_round'])
+    print(f"Round {tourney['current_round']} of {tourney['num_rounds']}")
+    for i, (p1, p2) in enumerate(pairings, 1):
+        result = f"  [{results[i]['score1']}-{results[i]['score2']}]" if i in results else ''
+        print(f"{i}. {p1} vs {p2}{result}")
+    for b in byes:
+        print(f"{b} gets a bye.")
+    if has_repeat:
+        print("Some repeating pairings this round (unavoidable due to player count).")
+
+
+def cmd_submit(args, conn):
+    tourney, players = _load(conn, args.tournament)
+    pairings, byes, _ = _current_pairings(conn, tourney, players)
+    if len(args.scores) != len(pairings):
+        raise SystemExit(f"Expected {len(pairings)} scores for round {tourney['current_round']}, got {len(args.scores)}.")
+    results = dict(zip(pairings, map(_parse_score, args.scores)))
+    round_num = tourney['current_round']
+    try:
+        new_matches = score_round(players, round_num, pairings, results)
+        storage.record_round(conn, args.tournament, round_num, new_matches, byes, build_standings(players))
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    print(f"Recorded round {round_num} results.")
+
+
+def cmd_score(args, conn):
+    tourney, players = _load(conn, args.tournament)
+    _current_pairings(conn, tourney, players)
+    round_num = tourney['current_round']
+    s1, s2 = _parse_score(args.score)
+    try:
+        completed = storage.record_result(conn, args.tournament, round_num, args.board, s1, s2, args.expect_version)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    if completed:
+        print(f"Recorded board {args.board}; round {round_num} is complete.")
+    else:
+        print(f"Recorded board {args.board} of round {round_num}.")
+
+
+def cmd_standings(args, conn):
+    _, players = _load(conn, args.tournament)
+    if args.round is not None:
+        standings = storage.load_standings(conn, args.tournament, args.round)
+        if not standings:
+            raise SystemExit(f"No standings stored for round {args.round}.")
+    else:
+        standings = storage.load_standings(conn, args.tournament) or build_standings(players)
+    print('\t'.join(STANDINGS_HEADER))
+    for row in standings:
+        print('\t'.join(str(row[c]) for c in STANDINGS_HEADER))
+
+
+def cmd_export(args, conn):
+    import pandas as pd
+
+    from .export import cross_table, standings_xlsx
+
+    _, players = _load(conn, args.tournament)
+    matches = storage.load_matches(conn, args.tournament)
+    if args.format == 'csv':
+        data = pd.DataFrame(matches, columns=storage.MATCH_COLUMNS).to_csv(index=False).encode('utf-8')
+    else:
+        df_s = pd.DataFrame(storage.load_standings(conn, args.tournament) or build_standings(players))
+        df_s['win_percentage'] = (df_s['wins'] / df_s['games_played'] * 100).round(2).fillna(0.00)
+        data = standings_xlsx(df_s, cross_table(players.names, matches))
+    if args.output == '-':
+        sys.stdout.buffer.write(data)
+    else:
+        with open(args.output, 'wb') as f:
+            f.write(data)
+        print(f"Wrote {args.output}.")
+
+
+def cmd_archive(args, conn):
+    from .export import export_archive
+
+    target = sys.stdout.buffer if args.output == '-' else args.output
+    compress = True if args.gzip else None
+    count = export_archive(conn, args.table, target, args.tournament, compress, args.chunk_size)
+    if args.output != '-':
+        print(f"Wrote {count} {args.table} row(s) to {args.output}.", file=sys.stderr)
+
+
+def cmd_batch_export(args, conn):
+    from .export import export_batch
+
+    def progress(done, total):
+        print(f"\r{done}/{total} tournaments", end='', file=sys.stderr, flush=True)
+
+    target = sys.stdout.buffer if args.output == '-' else args.output
+    count = export_batch(args.db, target, args.tournament, args.workers, progress)
+    print(f"\nWrote {count} tournament(s) to {args.output}.", file=sys.stderr)
+
+
+def cmd_simulate(args, conn):
+    from . import simulate
+
+    summary = simulate.run(
+        args.tournaments, args.players, args.rounds, output=args.output, workers=args.workers,
+        batch_size=args.batch_size, spread=args.spread, seed=args.seed,
+    )
+    print(f"Tournaments: {summary['tournaments']} ({summary['tournaments_per_sec']:.1f}/sec)")
+    print(f"Repeat pairing rate: {summary['repeat_rate']:.4f}")
+    print(f"Bye spread (max-min byes per player): {summary['byes_spread']}")
+    print(f"Mean Spearman rank accuracy: {summary['mean_spearman']:.4f}")
+    print(f"Strongest player finished first: {summary['top1_accuracy']:.2%}")
+
+
+def cmd_serve(args, conn):
+    from .server import make_server
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"No database at '{args.db}'; create it with init-db or the app first.")
+    server = make_server(args.db, args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Serving '{args.db}' read-only on http://{host}:{port}/tournaments (Ctrl+C to stop).", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.snapshots.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='croquet', description="Croquet Tournament Manager")
+    parser.add_argument('--db', default=storage.DB_PATH, help="SQLite database path (default: %(default)s)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('init-db', help="create the schema if missing").set_defaults(func=cmd_init_db)
+    sub.add_parser('migrate', help="convert legacy blob rows").set_defaults(func=cmd_migrate)
+    sub.add_parser('list', help="list tournaments").set_defaults(func=cmd_list)
+
+    p = sub.add_parser('create', help="create a tournament")
+    p.add_argument('name')
+    p.add_argument('--rounds', type=int, required=True)
+    p.add_argument('--players', nargs='*', default=[], metavar='NAME')
+    p.add_argument('--players-file', help="file with one player name per line")
+    p.add_argument('--tiebreaks', default='', metavar='KEY,KEY',
+                   help=f"standings order, e.g. score,buchholz (keys: {', '.join(TIEBREAKS)})")
+    p.set_defaults(func=cmd_create)
+
+    p = sub.add_parser('import', help="import players and results from CSV/XLSX in one transaction")
+    p.add_argument('--results', help="results file: round, player1, player2, score1, score2[, tournament]")
+    p.add_argument('--players', help="entry list: one name per row")
+    p.add_argument('--name', help="tournament name when the results have no tournament column")
+    p.add_argument('--rounds', type=int, help="number of rounds (default: last round in the results)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('pair', help="show the pairings for the current round")
+    p.add_argument('tournament', type=int)
+    p.add_argument('--repair', action='store_true', help="discard the stored pairings and pair the round again")
+    p.add_argument('--time-budget', type=float, metavar='SECONDS',
+                   help="stop the pairing search after this long with the best pairing found")
+    p.set_defaults(func=cmd_pair)
+
+    p = sub.add_parser('submit', help="record the current round's scores in pairing order")
+    p.add_argument('tournament', type=int)
+    p.add_argument('scores', nargs='+', metavar='S1-S2')
+    p.set_defaults(func=cmd_submit)
+
+    p = sub.add_parser('score', help="record one board's result of the current round")
+    p.add_argument('tournament', type=int)
+    p.add_argument('board', type=int)
+    p.add_argument('score', metavar='S1-S2')
+    p.add_argument('--expect-version', type=int, metavar='N',
+                   help="fail instead of overwriting if the board's result is no longer at version N (0: no result)")
+    p.set_defaults(func=cmd_score)
+
+    p = sub.add_parser('standings', help="print the latest standings")
+    p.add_argument('tournament', type=int)
+    p.add_argument('--round', type=int, help="standings after this round instead of the latest")
+    p.set_defaults(func=cmd_standings)
+
+    p = sub.add_parser('export', help="export matches (csv) or standings and cross-table (xlsx)")
+    p.add_argument('tournament', type=int)
+    p.add_argument('--format', choices=('csv', 'xlsx'), default='csv')
+    p.add_argument('-o', '--output', default='-', help="output file, '-' for stdout")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser('archive', help="stream matches, standings or byes of many tournaments as CSV")
+    p.add_argument('table', choices=('matches', 'standings', 'byes'))
+    p.add_argument('--tournament', type=int, action='append', metavar='ID',
+                   help="tournament to include (repeatable, default: all)")
+    p.add_argument('-o', '--output', default='-', help="output file, '-' for stdout; '.gz' compresses")
+    p.add_argument('--gzip', action='store_true', help="gzip-compress the output")
+    p.add_argument('--chunk-size', type=int, default=1000)
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser('batch-export', help="standings XLSX and matches CSV of many tournaments in one ZIP")
+    p.add_argument('--tournament', type=int, action='append', metavar='ID',
+                   help="tournament to include (repeatable, default: all)")
+    p.add_argument('-o', '--output', default='-', help="ZIP file, '-' for stdout")
+    p.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    p.set_defaults(func=cmd_batch_export, database=False)
+
+    p = sub.add_parser('simulate', help="run Monte Carlo tournaments against hidden strengths")
+    p.add_argument('--tournaments', type=int, default=1000)
+    p.add_argument('--players', type=int, default=16)
+    p.add_argument('--rounds', type=int, default=5)
+    p.add_argument('--spread', type=float, default=1.0, help="standard deviation of player strengths")
+    p.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    p.add_argument('--batch-size', type=int, default=50)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('-o', '--output', help="per-tournament rows, .csv or .parquet")
+    p.set_defaults(func=cmd_simulate, database=False)
+
+    p = sub.add_parser('serve', help="serve pairings, standings and cross-tables as read-only JSON")
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8502)
+    p.set_defaults(func=cmd_serve, database=False)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not getattr(args, 'database', True):
+        args.func(args, None)
+        return
+    conn = _open(args)
+    try:
+        args.func(args, conn)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
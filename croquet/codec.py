@@ -0,0 +1,105 @@
+import ast
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Encoded state starts with MAGIC, a format version byte and a codec id byte.
+# Anything without the header is a legacy repr() string from the old schema.
+MAGIC = b'CTM'
+FORMAT_VERSION = 1
+DEFAULT_CODEC = 'json'
+
+
+class CodecError(ValueError):
+    pass
+
+
+def _to_plain(obj):
+    # JSON and msgpack have no sets or tuples, so tag them on the way out.
+    if isinstance(obj, dict):
+        return {k: _to_plain(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_to_plain(v) for v in obj]
+    if isinstance(obj, tuple):
+        return {'__tuple__': [_to_plain(v) for v in obj]}
+    if isinstance(obj, (set, frozenset)):
+        return {'__set__': sorted((_to_plain(v) for v in obj), key=str)}
+    return obj
+
+
+def _from_plain(obj):
+    if isinstance(obj, dict):
+        if len(obj) == 1:
+            if '__set__' in obj:
+                return {_from_plain(v) for v in obj['__set__']}
+            if '__tuple__' in obj:
+                return tuple(_from_plain(v) for v in obj['__tuple__'])
+        return {k: _from_plain(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_from_plain(v) for v in obj]
+    return obj
+
+
+class JsonCodec:
+    codec_id = b'j'
+
+    def dumps(self, obj):
+        return json.dumps(_to_plain(obj), separators=(',', ':')).encode('utf-8')
+
+    def loads(self, payload):
+        return _from_plain(json.loads(payload.decode('utf-8')))
+
+
+class MsgpackCodec:
+    codec_id = b'm'
+
+    def dumps(self, obj):
+        return msgpack.packb(_to_plain(obj), use_bin_type=True)
+
+    def loads(self, payload):
+        return _from_plain(msgpack.unpackb(payload, raw=False, strict_map_key=False))
+
+
+CODECS = {'json': JsonCodec()}
+if msgpack is not None:
+    CODECS['msgpack'] = MsgpackCodec()
+_BY_ID = {c.codec_id: c for c in CODECS.values()}
+
+
+def encode(obj, codec=DEFAULT_CODEC):
+    """Serialize obj with the named codec behind a versioned header."""
+    if codec not in CODECS:
+        raise CodecError(f"Unknown or unavailable codec: {codec}")
+    c = CODECS[codec]
+    return MAGIC + bytes([FORMAT_VERSION]) + c.codec_id + c.dumps(obj)
+
+
+def is_legacy(data):
+    if isinstance(data, str):
+        return not data.startswith(MAGIC.decode('ascii'))
+    return not bytes(data).startswith(MAGIC)
+
+
+def decode(data):
+    """Deserialize encoded state, reading legacy repr() strings safely."""
+    if data is None:
+        return None
+    if is_legacy(data):
+        text = data if isinstance(data, str) else bytes(data).decode('utf-8')
+        try:
+            return ast.literal_eval(text)
+        except (ValueError, SyntaxError) as exc:
+            raise CodecError(f"Unreadable legacy value: {exc}") from exc
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    data = bytes(data)
+    version = data[len(MAGIC)]
+    if version > FORMAT_VERSION:
+        raise CodecError(f"Unsupported format version {version}")
+    codec = _BY_ID.get(data[len(MAGIC) + 1:len(MAGIC) + 2])
+    if codec is None:
+        raise CodecError("Unknown or unavailable codec in encoded data")
+    return codec.loads(data[len(MAGIC) + 2:])
@@ -0,0 +1,307 @@
+"""Pairing, scoring and standings logic shared by the UI and the CLI."""
+import logging
+import time
+
+import numpy as np
+
+from .matching import MatchingTimeout, max_weight_matching
+from .players import PlayerStore
+
+logger = logging.getLogger(__name__)
+
+WINNING_SCORE = 7
+
+
+def sort_key(p):
+    return (-p['score'], -p['net_hoops'], -p['hoops_scored'])
+
+
+def _pairing_weights(n):
+    # Costs are compared lexicographically: repeats, then bye position, then
+    # squared rank gap (unit 1), so each level gets a multiplier larger than
+    # everything below. The bye thus goes to the highest-ranked player that
+    # keeps the fewest repeats, as the exhaustive search did.
+    max_gap_cost = (n // 2) * n * n
+    bye_unit = max_gap_cost + 1
+    repeat_unit = bye_unit * n + max_gap_cost + 1
+    return repeat_unit, bye_unit
+
+
+def _min_cost_pairing(n, played, max_gap, deadline=None):
+    """Return (mate, cost, edges) for the cheapest pairing using rank gaps up to max_gap.
+
+    Positions 0..n-1 are players in sort_key order; for odd n position n is the
+    bye. mate is None when no complete pairing exists within max_gap; edges is
+    the number of candidate pairs searched. Raises MatchingTimeout once
+    deadline passes.
+    """
+    repeat_unit, bye_unit = _pairing_weights(n)
+    rows, cols = np.triu_indices(n, 1)
+    band = cols - rows <= max_gap
+    rows, cols = rows[band], cols[band]
+    edge_costs = repeat_unit * played[rows, cols].astype(np.int64) + (cols - rows) ** 2
+    costs = list(zip(rows.tolist(), cols.tolist(), edge_costs.tolist()))
+    if n % 2:
+        costs.extend((i, n, bye_unit * i) for i in range(n))
+    top = max(c for _, _, c in costs) + 1
+    mate = max_weight_matching([(i, j, top - c) for i, j, c in costs], maxcardinality=True, deadline=deadline)
+    if len(mate) < n + n % 2 or -1 in mate:
+        return None, None, len(costs)
+    return mate, _pairing_cost(n, played, mate), len(costs)
+
+
+def _pairing_cost(n, played, mate):
+    repeat_unit, bye_unit = _pairing_weights(n)
+    cost = 0
+    for i in range(n):
+        j = mate[i]
+        if j == n:
+            cost += bye_unit * i
+        elif i < j:
+            cost += repeat_unit * int(played[i, j]) + (j - i) ** 2
+    return cost
+
+
+def search_pairings(entities, time_budget=None):
+    """Find the cheapest pairing, stopping at time_budget seconds if given.
+
+    Returns (pairings, byes, has_repeat, info). The search is anytime: it
+    starts from the adjacent pairing in standings order and improves on it
+    with matchings over wider and wider bands of ranks, so when the budget
+    runs out the best pairing found so far is returned. info holds
+    'optimal' (whether that pairing is proven cheapest), 'solves', 'edges'
+    (candidate pairs searched), 'pruned' (pairs left out by the bands),
+    'max_gap', 'timed_out' and 'elapsed' seconds.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget is not None else None
+    if isinstance(entities, PlayerStore):
+        order = np.array(entities.ranking(), dtype=np.intp)
+        entity_list = [entities[i] for i in order.tolist()]
+        played = entities.played_matrix()[np.ix_(order, order)]
+    else:
+        entity_list = sorted(entities, key=sort_key)
+        played = np.array([[q['name'] in p['opponents'] for q in entity_list] for p in entity_list], dtype=bool)
+        played = played.reshape(len(entity_list), len(entity_list))
+    n = len(entity_list)
+    names = [p['name'] for p in entity_list]
+    info = {'optimal': True, 'solves': 0, 'edges': 0, 'pruned': 0, 'max_gap': 1, 'timed_out': False}
+
+    # Adjacent pairing in standings order, bye to the leader, is the cheapest
+    # possible pairing whenever it has no repeats.
+    first = n % 2
+    mate = list(range(n + first))
+    if first:
+        mate[0], mate[n] = n, 0
+    for i in range(first, n - 1, 2):
+        mate[i], mate[i + 1] = i + 1, i
+
+    adjacent = np.arange(first, n - 1, 2)
+    if played[adjacent, adjacent + 1].any():
+        # Solve on a band of nearby ranks first and widen it until no pairing
+        # using a longer gap could beat the band's optimum.
+        info['optimal'] = False
+        best_cost = _pairing_cost(n, played, mate)
+        all_pairs = n * (n - 1) // 2
+        max_gap = 2
+        while True:
+            try:
+                band_mate, cost, edges = _min_cost_pairing(n, played, max_gap, deadline)
+            except MatchingTimeout:
+                info['timed_out'] = True
+                break
+            info['solves'] += 1
+            info['edges'] += edges
+            info['pruned'] += all_pairs - edges + (n if first else 0)
+            info['max_gap'] = max_gap
+            if band_mate is not None and cost <= best_cost:
+                mate, best_cost = band_mate, cost
+            if max_gap >= n - 1:
+                info['optimal'] = True
+                break
+            # A pairing with a longer gap costs at least this much; a band optimum
+            # this cheap has no repeats and the bye (if any) with the leader, so
+            # nothing outside the band can beat it.
+            if band_mate is not None and cost <= (max_gap + 1) ** 2 + n // 2 - 1:
+                info['optimal'] = True
+                break
+            max_gap *= 2
+
+    best_pairings = []
+    best_byes = []
+    has_repeat = False
+    for i in range(n):
+        j = mate[i]
+        if j == n:
+            best_byes = [names[i]]
+        elif i < j:
+            best_pairings.append((names[i], names[j]))
+            has_repeat = has_repeat or bool(played[i, j])
+
+    info['elapsed'] = time.perf_counter() - started
+    if info['timed_out']:
+        logger.warning(
+            "Pairing search hit its %gs budget after %d solves; using the best pairing found so far.",
+            time_budget, info['solves']
+        )
+    return best_pairings, best_byes, has_repeat, info
+
+
+def generate_pairings(entities, modifying=True, time_budget=None):
+    best_pairings, best_byes, has_repeat, _ = search_pairings(entities, time_budget)
+
+    if modifying and best_pairings and isinstance(entities, PlayerStore):
+        for p1, p2 in best_pairings:
+            entities.record_pairing(p1, p2)
+    elif modifying and best_pairings:
+        by_name = {p['name']: p for p in entities}
+        for p1, p2 in best_pairings:
+            by_name[p1]['opponents'].add(p2)
+            by_name[p2]['opponents'].add(p1)
+
+    return best_pairings, best_byes, has_repeat
+
+
+def update_player_stats(pl, s_scored, s_conceded, is_win):
+    pl['games_played'] += 1
+    if is_win:
+        pl['wins'] += 1
+        pl['score'] += 1.0
+    else:
+        pl['losses'] += 1
+    pl['hoops_scored'] += s_scored
+    pl['hoops_conceded'] += s_conceded
+    pl['net_hoops'] = pl['hoops_scored'] - pl['hoops_conceded']
+
+
+def reset_player_stats(players):
+    if isinstance(players, PlayerStore):
+        players.reset_stats()
+        return
+    for p in players:
+        p['score'] = 0.0
+        p['games_played'] = 0
+        p['wins'] = 0
+        p['losses'] = 0
+        p['hoops_scored'] = 0
+        p['hoops_conceded'] = 0
+        p['net_hoops'] = 0
+
+
+def match_winner(score1, score2):
+    """Return True if player1 won, False if player2 won.
+
+    Raises ValueError unless exactly one side reached the winning score.
+    """
+    if score1 == WINNING_SCORE and score2 < WINNING_SCORE:
+        return True
+    if score2 == WINNING_SCORE and score1 < WINNING_SCORE:
+        return False
+    raise ValueError(f"Invalid score {score1}-{score2}: Must be first to {WINNING_SCORE}.")
+
+
+def apply_match(players, match):
+    is_win1 = match_winner(match['score1'], match['score2'])
+    update_player_stats(players[match['player1']], match['score1'], match['score2'], is_win1)
+    update_player_stats(players[match['player2']], match['score2'], match['score1'], not is_win1)
+
+
+def score_round(players, round_num, pairings, results):
+    """Apply one round of results and return the new match rows.
+
+    results maps each (player1, player2) pairing to its (score1, score2).
+    Every score is validated before any player is updated.
+    """
+    new_matches = []
+    for p1, p2 in pairings:
+        s1, s2 = results[(p1, p2)]
+        match_winner(s1, s2)
+        new_matches.append({'round': round_num, 'player1': p1, 'player2': p2, 'score1': s1, 'score2': s2})
+    for match in new_matches:
+        apply_match(players, match)
+    players.record_matches(new_matches)
+    return new_matches
+
+
+def validate_matches(matches):
+    """Raise ValueError naming the first match that is not a first-to-7 result."""
+    for match in matches:
+        try:
+            match_winner(match['score1'], match['score2'])
+        except ValueError:
+            raise ValueError(
+                f"Invalid score in Round {match['round']} for {match['player1']} vs {match['player2']}: "
+                f"Must be first to {WINNING_SCORE}."
+            ) from None
+
+
+def replay_matches(players, matches):
+    """Recompute every player's stats from scratch out of the match rows."""
+    validate_matches(matches)
+    reset_player_stats(players)
+    for match in matches:
+        apply_match(players, match)
+
+
+def changed_matches(matches, edited_matches):
+    """Return the edited matches whose scores differ from the stored ones."""
+    stored = {(m['round'], m['player1'], m['player2']): (m['score1'], m['score2']) for m in matches}
+    return [
+        m for m in edited_matches
+        if stored.get((m['round'], m['player1'], m['player2'])) != (m['score1'], m['score2'])
+    ]
+
+
+def checkpoint_consistent(players, matches):
+    """Check that the players' aggregates can be the result of matches.
+
+    Every game adds one win, one loss, two games played and the same hoops to
+    both the scored and conceded totals, so a snapshot that breaks any of
+    these sums (for instance one written while hoops_conceded was overwritten
+    instead of accumulated) cannot be resumed from.
+    """
+    if len(players) == 0:
+        return not matches
+    games = sum(players.games_played)
+    hoops = sum(m['score1'] + m['score2'] for m in matches)
+    return (
+        games == 2 * len(matches)
+        and sum(players.wins) == sum(players.losses) == len(matches)
+        and sum(players.hoops_scored) == sum(players.hoops_conceded) == hoops
+    )
+
+
+def recompute_standings(players, matches, from_round, last_round):
+    """Apply rounds from_round..last_round and return {round: standings rows}.
+
+    players must hold the aggregates and meetings as of the end of round
+    from_round - 1; only the rounds from from_round on are replayed.
+    """
+    by_round = {}
+    for match in matches:
+        by_round.setdefault(match['round'], []).append(match)
+    snapshots = {}
+    for round_num in range(from_round, last_round + 1):
+        for match in by_round.get(round_num, ()):
+            apply_match(players, match)
+        players.record_matches(by_round.get(round_num, []))
+        snapshots[round_num] = build_standings(players)
+    return snapshots
+
+
+def build_standings(players):
+    """Return the ranked standings rows for the players' current stats."""
+    return [
+        {
+            'rank': i + 1,
+            'name': p['name'],
+            'games_played': p['games_played'],
+            'wins': p['wins'],
+            'losses': p['losses'],
+            'hoops_scored': p['hoops_scored'],
+            'hoops_conceded': p['hoops_conceded'],
+            'net_hoops': p['net_hoops'],
+            'points': p['score'],
+            'win_percentage': (p['wins'] / p['games_played'] * 100) if p['games_played'] > 0 else 0.00
+        } for i, p in enumerate(players.ranked())
+    ]
@@ -0,0 +1,226 @@
+import csv
+import gzip
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from copy import copy
+from io import BytesIO, TextIOWrapper
+
+import numpy as np
+import pandas as pd
+
+from . import storage
+from .engine import build_standings
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class _CellFactory:
+    """Creates pre-styled write-only cells for one worksheet.
+
+    Styles are resolved once into template cells and their style arrays are
+    copied onto each new cell, instead of re-registering the same Font and
+    Alignment for every cell written.
+    """
+
+    def __init__(self, ws):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        self.ws = ws
+        self._cell = WriteOnlyCell
+        thin = Side(style='thin')
+        body = WriteOnlyCell(ws)
+        body.alignment = Alignment(horizontal='center')
+        header = WriteOnlyCell(ws)
+        header.alignment = Alignment(horizontal='center')
+        header.font = Font(bold=True)
+        header.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        self._body_style = body._style
+        self._header_style = header._style
+
+    def __call__(self, value, header=False):
+        if value is None or value == '':
+            # Empty cells carry no visible style, so leave them out entirely.
+            return None
+        cell = self._cell(self.ws, value=value)
+        cell._style = copy(self._header_style if header else self._body_style)
+        return cell
+
+
+def cross_table(player_names, matches):
+    """Build the player-by-player W/L score matrix as a DataFrame.
+
+    Cells are filled with one vectorized assignment per side over all
+    matches; when two players met more than once the latest result wins.
+    """
+    n = len(player_names)
+    grid = np.full((n, n), '', dtype=object)
+    np.fill_diagonal(grid, '-')
+    if matches:
+        index = {name: i for i, name in enumerate(player_names)}
+        i1 = np.array([index[m['player1']] for m in matches])
+        i2 = np.array([index[m['player2']] for m in matches])
+        s1 = np.array([m['score1'] for m in matches])
+        s2 = np.array([m['score2'] for m in matches])
+        win1 = (s1 == 7) & (s2 < 7)
+        decided = win1 | ((s2 == 7) & (s1 < 7))
+
+        # Keep only the last decided result for each unordered pair.
+        rows = np.flatnonzero(decided)
+        pair = np.minimum(i1[rows], i2[rows]) * n + np.maximum(i1[rows], i2[rows])
+        _, last = np.unique(pair[::-1], return_index=True)
+        rows = rows[len(rows) - 1 - last]
+
+        a = np.where(win1[rows], 'W ', 'L ').astype(object)
+        b = np.where(win1[rows], 'L ', 'W ').astype(object)
+        t1 = s1[rows].astype(str).astype(object)
+        t2 = s2[rows].astype(str).astype(object)
+        grid[i1[rows], i2[rows]] = a + t1 + '-' + t2
+        grid[i2[rows], i1[rows]] = b + t2 + '-' + t1
+    return pd.DataFrame(grid, index=list(player_names), columns=list(player_names))
+
+
+def standings_xlsx(df_standings, cross_table, sheet="Final Standings"):
+    """Render the standings table and cross-table as XLSX bytes.
+
+    The workbook is streamed row by row into memory in write-only mode, so
+    large fields never touch the disk or keep a full cell grid around.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet)
+    cell = _CellFactory(ws)
+
+    ws.append([cell(c, header=True) for c in df_standings.columns])
+    for row in df_standings.itertuples(index=False):
+        ws.append([cell(v) for v in row])
+
+    ws.append([cell(None)])
+    ws.append([cell(None)] + [cell(c, header=True) for c in cross_table.columns])
+    for name, *values in cross_table.itertuples():
+        ws.append([cell(name, header=True)] + [cell(v) for v in values])
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def write_archive_csv(conn, table, out, tournament_ids=None, chunk_size=1000):
+    """Stream one archive table as CSV to the text stream out; return the row count.
+
+    Rows carry tournament_id and tournament columns ahead of the table's own,
+    and are written chunk by chunk as they are read.
+    """
+    columns, _ = storage.ARCHIVE_TABLES[table]
+    writer = csv.writer(out)
+    writer.writerow(['tournament_id', 'tournament'] + columns)
+    count = 0
+    for rows in storage.iter_archive(conn, table, tournament_ids, chunk_size):
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def export_archive(conn, table, path_or_file, tournament_ids=None, compress=None, chunk_size=1000):
+    """Write an archive table as CSV to a path or binary file; return the row count.
+
+    Output is gzip-compressed when compress is true, or when compress is None
+    and the path ends in '.gz'.
+    """
+    if compress is None:
+        compress = isinstance(path_or_file, str) and path_or_file.endswith('.gz')
+    if compress:
+        # Closing finishes the gzip stream; a file object passed in stays open.
+        out, owned = gzip.open(path_or_file, 'wt', newline='', encoding='utf-8'), True
+    elif isinstance(path_or_file, str):
+        out, owned = open(path_or_file, 'w', newline='', encoding='utf-8'), True
+    else:
+        out, owned = TextIOWrapper(path_or_file, newline='', encoding='utf-8', write_through=True), False
+    try:
+        return write_archive_csv(conn, table, out, tournament_ids, chunk_size)
+    finally:
+        if owned:
+            out.close()
+        else:
+            out.flush()
+            out.detach()
+
+
+def tournament_files(conn, tournament_id):
+    """Return (tournament, standings XLSX bytes, matches CSV bytes), or None if it does not exist."""
+    tourney = storage.load_tournament(conn, tournament_id)
+    if tourney is None:
+        return None
+    with storage.read_snapshot(conn):
+        matches = storage.load_matches(conn, tournament_id)
+        players = storage.load_players(conn, tournament_id, matches)
+        standings = storage.load_standings(conn, tournament_id)
+    df_s = pd.DataFrame(standings or build_standings(players))
+    df_s['win_percentage'] = (df_s['wins'] / df_s['games_played'] * 100).round(2).fillna(0.00)
+    xlsx = standings_xlsx(df_s, cross_table(players.names, matches))
+    matches_csv = pd.DataFrame(matches, columns=storage.MATCH_COLUMNS).to_csv(index=False).encode('utf-8')
+    return tourney, xlsx, matches_csv
+
+
+def _batch_worker(db_path, tournament_id):
+    conn = storage.connect(db_path)
+    try:
+        return tournament_files(conn, tournament_id)
+    finally:
+        conn.close()
+
+
+def _folder(tourney):
+    name = re.sub(r'[^\w.-]+', '_', tourney['name']).strip('_') or 'tournament'
+    return f"{tourney['id']:04d}-{name}"
+
+
+def export_batch(db_path, path_or_file, tournament_ids=None, workers=None, progress=None):
+    """Write each tournament's standings.xlsx and matches.csv into one ZIP; return how many were written.
+
+    Tournaments (all of them by default) are rendered in workers processes,
+    all cores by default, with at most two per worker in flight, and each
+    one is written to the archive and dropped as soon as it is done, so
+    memory does not grow with the season. progress(done, total) is called
+    after each tournament; ids that no longer exist are skipped.
+    """
+    if tournament_ids is None:
+        conn = storage.connect(db_path)
+        try:
+            tournament_ids = [row[0] for row in storage.list_tournaments(conn)]
+        finally:
+            conn.close()
+    ids = iter(list(tournament_ids))
+    total = len(tournament_ids)
+    workers = min(workers or os.cpu_count() or 1, max(total, 1))
+    done_count = written = 0
+    # Workers are spawned rather than forked, since the caller may be a threaded server.
+    context = multiprocessing.get_context('spawn')
+    with zipfile.ZipFile(path_or_file, 'w', zipfile.ZIP_DEFLATED) as archive, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = set()
+        while True:
+            for tournament_id in ids:
+                pending.add(pool.submit(_batch_worker, db_path, tournament_id))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files = future.result()
+                done_count += 1
+                if files is not None:
+                    tourney, xlsx, matches_csv = files
+                    folder = _folder(tourney)
+                    # XLSX is already a deflated ZIP; compressing it again only costs time.
+                    archive.writestr(f"{folder}/standings.xlsx", xlsx, compress_type=zipfile.ZIP_STORED)
+                    archive.writestr(f"{folder}/matches.csv", matches_csv)
+                    written += 1
+                if progress is not None:
+                    progress(done_count, total)
+    return written
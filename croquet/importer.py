@@ -0,0 +1,153 @@
+"""Bulk import of entry lists and results from CSV or XLSX files.
+
+A players file has one name per row, in a 'name' column or otherwise the
+first column. A results file has 'round', 'player1', 'player2', 'score1'
+and 'score2' columns, plus an optional 'tournament' column so one file can
+carry a whole season. Everything is validated before anything is written,
+and storage.bulk_create_tournaments then stores all tournaments in one
+transaction.
+"""
+import os
+from datetime import datetime
+
+from . import storage
+from .engine import recompute_standings, validate_matches
+from .players import PlayerStore
+from .ranking import DEFAULT_CHAIN
+
+RESULT_COLUMNS = ['round', 'player1', 'player2', 'score1', 'score2']
+
+
+def read_table(source, filename=None):
+    """Read a CSV or XLSX file (path or file object) into a DataFrame.
+
+    The format follows the extension of filename, or of source when it is
+    a path. XLSX needs openpyxl.
+    """
+    import pandas as pd
+
+    name = filename or (source if isinstance(source, (str, os.PathLike)) else '')
+    if str(name).lower().endswith(('.xlsx', '.xlsm')):
+        df = pd.read_excel(source, dtype=object)
+    else:
+        df = pd.read_csv(source, dtype=object, skipinitialspace=True)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    return df.dropna(how='all')
+
+
+def player_names(df):
+    """Names from a players table, in file order."""
+    column = 'name' if 'name' in df.columns else df.columns[0]
+    return [str(v).strip() for v in df[column].dropna() if str(v).strip()]
+
+
+def _int(value, what):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{what} must be a whole number, got {value!r}.") from None
+    if number != int(number):
+        raise ValueError(f"{what} must be a whole number, got {value!r}.")
+    return int(number)
+
+
+def matches_from_table(df):
+    """Group a results table into {tournament name or None: [match rows]}."""
+    missing = [c for c in RESULT_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Results file is missing column(s): {', '.join(missing)}.")
+    grouped = {}
+    has_tournament = 'tournament' in df.columns
+    for line, row in enumerate(df.to_dict('records'), 2):
+        where = f"line {line}"
+        match = {
+            'round': _int(row['round'], f"Round on {where}"),
+            'player1': str(row['player1']).strip(),
+            'player2': str(row['player2']).strip(),
+            'score1': _int(row['score1'], f"score1 on {where}"),
+            'score2': _int(row['score2'], f"score2 on {where}"),
+        }
+        key = str(row['tournament']).strip() if has_tournament else None
+        grouped.setdefault(key, []).append(match)
+    return grouped
+
+
+def build_tournament(name, players, matches, num_rounds=None, created_date=None, tiebreaks=DEFAULT_CHAIN):
+    """Validate one tournament and return it in the shape bulk_create_tournaments stores.
+
+    players may be empty, in which case the entry list is every player named
+    in matches, in order of first appearance. In an odd field the one player
+    missing from a round had the bye; any other gap is an error. Standings
+    are replayed round by round.
+    """
+    if not players:
+        players = list(dict.fromkeys(n for m in matches for n in (m['player1'], m['player2'])))
+    if len(players) < 2:
+        raise ValueError(f"Tournament '{name}' needs at least two players.")
+    if len(set(players)) < len(players):
+        raise ValueError(f"Player names must be unique in tournament '{name}'.")
+    validate_matches(matches)
+
+    known = set(players)
+    rounds = {}
+    for m in matches:
+        for p in (m['player1'], m['player2']):
+            if p not in known:
+                raise ValueError(f"Round {m['round']} of '{name}' names unknown player {p!r}.")
+        if m['round'] < 1:
+            raise ValueError(f"Round numbers must start at 1 in tournament '{name}'.")
+        seen = rounds.setdefault(m['round'], set())
+        if m['player1'] == m['player2'] or m['player1'] in seen or m['player2'] in seen:
+            raise ValueError(
+                f"A player appears twice in round {m['round']} of '{name}' "
+                f"({m['player1']} vs {m['player2']})."
+            )
+        seen.update((m['player1'], m['player2']))
+
+    last_round = max(rounds, default=0)
+    expected_byes = len(players) % 2
+    for round_num in range(1, last_round + 1):
+        missing = [p for p in players if p not in rounds.get(round_num, ())]
+        if len(missing) != expected_byes:
+            raise ValueError(
+                f"Round {round_num} of '{name}' has no result for {', '.join(missing)}; "
+                f"every player must play{' except one bye' if expected_byes else ''}."
+            )
+    num_rounds = num_rounds or last_round or 1
+    if last_round > num_rounds:
+        raise ValueError(f"Tournament '{name}' has results for round {last_round} but only {num_rounds} rounds.")
+    matches = sorted(matches, key=lambda m: m['round'])
+    return {
+        'name': name,
+        'created_date': created_date or datetime.now().isoformat(),
+        'num_rounds': num_rounds,
+        'current_round': last_round + 1,
+        'players': players,
+        'matches': matches,
+        'byes': {r: [p for p in players if p not in rounds.get(r, ())] for r in range(1, last_round + 1)},
+        'tiebreaks': tiebreaks,
+        'standings': recompute_standings(PlayerStore(players, tiebreaks), matches, 1, last_round),
+    }
+
+
+def import_files(conn, results=None, players=None, name=None, num_rounds=None,
+                 results_filename=None, players_filename=None):
+    """Import a players file and/or a results file; return the new tournament ids.
+
+    Without a 'tournament' column every result (and the players file)
+    belongs to one tournament called name. With one, each distinct value
+    becomes its own tournament and the players file is not used. Raises
+    ValueError if nothing would be imported.
+    """
+    names = player_names(read_table(players, players_filename)) if players is not None else []
+    grouped = matches_from_table(read_table(results, results_filename)) if results is not None else {None: []}
+    if not grouped:
+        raise ValueError("The results file has no results to import.")
+    tournaments = []
+    for key, matches in grouped.items():
+        title = key if key is not None else name
+        if not title:
+            raise ValueError("A tournament name is required.")
+        entrants = names if key is None else []
+        tournaments.append(build_tournament(title, entrants, matches, num_rounds))
+    return storage.bulk_create_tournaments(conn, tournaments)
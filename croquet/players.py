@@ -0,0 +1,147 @@
+from array import array
+
+import numpy as np
+
+from .ranking import DEFAULT_CHAIN, rank
+
+FLOAT_FIELDS = ('score',)
+INT_FIELDS = ('games_played', 'wins', 'losses', 'hoops_scored', 'hoops_conceded', 'net_hoops')
+STAT_FIELDS = FLOAT_FIELDS + INT_FIELDS
+
+
+class Player:
+    """Dict-style view of one row of a PlayerStore.
+
+    Supports p['name'], p['opponents'] and p[stat] reads and writes, so the
+    pairing and stats helpers work the same on views and on plain dicts.
+    """
+
+    __slots__ = ('_store', '_i')
+
+    def __init__(self, store, i):
+        self._store = store
+        self._i = i
+
+    def __getitem__(self, key):
+        if key == 'name':
+            return self._store.names[self._i]
+        if key == 'opponents':
+            return self._store.opponents[self._i]
+        if key in STAT_FIELDS:
+            return getattr(self._store, key)[self._i]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in STAT_FIELDS:
+            raise KeyError(key)
+        getattr(self._store, key)[self._i] = value
+
+    def __repr__(self):
+        return f"Player({self._store.to_dict(self._i)!r})"
+
+
+class PlayerStore:
+    """Compact per-tournament player table with O(1) lookup by name.
+
+    Each stat is one typed array indexed by player position, in the order
+    the players were entered. play_count[i, j] counts the games recorded
+    between players i and j and is kept in step with the opponent sets;
+    win_count[i, j] counts how many of those i won. tiebreaks is the chain
+    ranking() orders by.
+    """
+
+    __slots__ = ('names', 'index', 'opponents', 'play_count', 'win_count', 'tiebreaks') + STAT_FIELDS
+
+    def __init__(self, names, tiebreaks=DEFAULT_CHAIN):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+        for field in FLOAT_FIELDS:
+            setattr(self, field, array('d', bytes(8 * n)))
+        for field in INT_FIELDS:
+            setattr(self, field, array('q', bytes(8 * n)))
+        self.opponents = [set() for _ in range(n)]
+        self.play_count = np.zeros((n, n), dtype=np.int16)
+        self.win_count = np.zeros((n, n), dtype=np.int16)
+        self.tiebreaks = tuple(tiebreaks)
+
+    @classmethod
+    def from_dicts(cls, players):
+        store = cls(p['name'] for p in players)
+        for i, p in enumerate(players):
+            for field in STAT_FIELDS:
+                getattr(store, field)[i] = p[field]
+            store.opponents[i] = set(p['opponents'])
+            for name in p['opponents']:
+                j = store.index[name]
+                store.play_count[i, j] = store.play_count[j, i] = 1
+        return store
+
+    def record_pairing(self, name1, name2):
+        i, j = self.index[name1], self.index[name2]
+        self.opponents[i].add(name2)
+        self.opponents[j].add(name1)
+        self.play_count[i, j] += 1
+        self.play_count[j, i] += 1
+
+    def record_matches(self, matches):
+        """Add a batch of match dicts to the opponent sets, play and win counts."""
+        if not matches:
+            return
+        i1 = np.array([self.index[m['player1']] for m in matches])
+        i2 = np.array([self.index[m['player2']] for m in matches])
+        s1 = np.array([m['score1'] for m in matches])
+        s2 = np.array([m['score2'] for m in matches])
+        np.add.at(self.play_count, (i1, i2), 1)
+        np.add.at(self.play_count, (i2, i1), 1)
+        np.add.at(self.win_count, (i1[s1 > s2], i2[s1 > s2]), 1)
+        np.add.at(self.win_count, (i2[s2 > s1], i1[s2 > s1]), 1)
+        for m in matches:
+            self.opponents[self.index[m['player1']]].add(m['player2'])
+            self.opponents[self.index[m['player2']]].add(m['player1'])
+
+    def played_matrix(self):
+        """Boolean n x n matrix of which players have already met."""
+        return self.play_count > 0
+
+    def to_dict(self, i):
+        d = {'name': self.names[i]}
+        for field in STAT_FIELDS:
+            d[field] = getattr(self, field)[i]
+        d['opponents'] = set(self.opponents[i])
+        return d
+
+    def to_dicts(self):
+        return [self.to_dict(i) for i in range(len(self.names))]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return (Player(self, i) for i in range(len(self.names)))
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, key):
+        """Look a player up by name or by position."""
+        if isinstance(key, str):
+            return Player(self, self.index[key])
+        return Player(self, key)
+
+    def reset_stats(self):
+        n = len(self.names)
+        for field in FLOAT_FIELDS:
+            setattr(self, field, array('d', bytes(8 * n)))
+        for field in INT_FIELDS:
+            setattr(self, field, array('q', bytes(8 * n)))
+
+    def ranking(self):
+        """Player positions in standings order under the tiebreaks chain.
+
+        The default chain gives the same order as sorting by sort_key.
+        """
+        return rank(self, self.tiebreaks)
+
+    def ranked(self):
+        return [Player(self, i) for i in self.ranking()]
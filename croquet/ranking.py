@@ -0,0 +1,90 @@
+"""Standings order from a configurable chain of tiebreaks.
+
+Every tiebreak is computed for the whole field at once with NumPy, from the
+PlayerStore's stat arrays, its play_count matrix (who met whom) and its
+win_count matrix (who beat whom), and the chain is applied with a single
+stable lexsort. With DEFAULT_CHAIN the order is exactly the one sorting by
+engine.sort_key gives.
+"""
+import numpy as np
+
+DEFAULT_CHAIN = ('score', 'net_hoops', 'hoops_scored')
+
+
+def _stat(field):
+    return lambda players, tied: np.asarray(getattr(players, field), dtype=np.float64)
+
+
+def _buchholz(players, tied):
+    # Sum of opponents' scores, counting an opponent once per meeting.
+    return players.play_count.astype(np.float64) @ np.asarray(players.score, dtype=np.float64)
+
+
+def _median_buchholz(players, tied):
+    # Buchholz without the best and worst opponent, once a player has met three or more.
+    met = players.play_count > 0
+    score = np.broadcast_to(np.asarray(players.score, dtype=np.float64), met.shape)
+    buchholz = _buchholz(players, tied)
+    if not met.any():
+        return buchholz
+    best = np.where(met, score, score.min()).max(axis=1)
+    worst = np.where(met, score, score.max()).min(axis=1)
+    return np.where(met.sum(axis=1) >= 3, buchholz - best - worst, buchholz)
+
+
+def _sonneborn_berger(players, tied):
+    # Sum of the scores of the opponents a player beat.
+    return players.win_count.astype(np.float64) @ np.asarray(players.score, dtype=np.float64)
+
+
+def _head_to_head(players, tied):
+    # Wins against the players still level on every earlier tiebreak.
+    return (players.win_count * tied).sum(axis=1).astype(np.float64)
+
+
+# name: (label, function(players, tied) -> values, higher is better)
+TIEBREAKS = {
+    'score': ("Points", _stat('score'), True),
+    'wins': ("Wins", _stat('wins'), True),
+    'net_hoops': ("Net hoops", _stat('net_hoops'), True),
+    'hoops_scored': ("Hoops scored", _stat('hoops_scored'), True),
+    'hoops_conceded': ("Hoops conceded", _stat('hoops_conceded'), False),
+    'buchholz': ("Buchholz", _buchholz, True),
+    'median_buchholz': ("Median Buchholz", _median_buchholz, True),
+    'sonneborn_berger': ("Sonneborn-Berger", _sonneborn_berger, True),
+    'head_to_head': ("Head-to-head", _head_to_head, True),
+}
+
+
+def parse_chain(text):
+    """Turn 'score,buchholz' (or an iterable of names) into a validated chain tuple."""
+    chain = tuple(s.strip() for s in (text.split(',') if isinstance(text, str) else text) if s.strip())
+    unknown = [name for name in chain if name not in TIEBREAKS]
+    if unknown:
+        raise ValueError(f"Unknown tiebreak(s): {', '.join(unknown)}. Choose from {', '.join(TIEBREAKS)}.")
+    return chain or DEFAULT_CHAIN
+
+
+def tiebreak_values(players, chain=DEFAULT_CHAIN):
+    """Return {name: values} for each tiebreak in chain, one value per player position."""
+    n = len(players)
+    values = {}
+    # Players are "tied" while they agree on every key so far; head-to-head
+    # only counts games inside the group it is breaking.
+    group = np.zeros(n, dtype=np.int64)
+    for name in chain:
+        tied = group[:, None] == group[None, :]
+        column = TIEBREAKS[name][1](players, tied)
+        values[name] = column
+        _, group = np.unique(np.stack([group.astype(np.float64), column]), axis=1, return_inverse=True)
+        group = group.reshape(n)
+    return values
+
+
+def rank(players, chain=DEFAULT_CHAIN):
+    """Player positions in standings order under chain; ties keep entry order."""
+    if len(players) == 0:
+        return []
+    values = tiebreak_values(players, chain)
+    keys = [values[name] if not TIEBREAKS[name][2] else -values[name] for name in reversed(chain)]
+    return np.lexsort(keys).tolist()
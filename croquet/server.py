@@ -0,0 +1,216 @@
+"""Read-only JSON endpoint for spectators: ``python -m croquet serve``.
+
+    GET /tournaments         id, name and created date of every tournament
+    GET /tournaments/<id>    current pairings, latest standings and cross-table
+
+Each tournament's response body is built once per tournament version and
+kept as encoded bytes, so a refresh costs one version query until the next
+write. The version is also the ETag; a client that sends it back in
+If-None-Match gets an empty 304 without the body being looked at at all.
+
+The database is opened read-only and is never migrated from here: a
+tournament still in the old single-row format, or a database whose schema
+predates the current one, answers 503 until the app has opened it once.
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import storage
+from .cache import TournamentCache
+from .engine import build_standings
+from .export import cross_table
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8502
+TOURNAMENT_PATH = re.compile(r'^/tournaments/(\d+)/?$')
+
+
+def snapshot(entry):
+    """The spectator view of a TournamentCache entry, as a JSON-ready dict."""
+    tourney = entry['tournament']
+    stored = entry['pairings']
+    pairings, byes = (stored[0], stored[1]) if stored is not None else ([], [])
+    results = entry['results']
+    standings = entry['standings'] or build_standings(TournamentCache.players(entry))
+    names = entry['player_names']
+    return {
+        'id': tourney['id'],
+        'name': tourney['name'],
+        'version': entry['version'],
+        'round': min(tourney['current_round'], tourney['num_rounds']),
+        'num_rounds': tourney['num_rounds'],
+        'complete': tourney['current_round'] > tourney['num_rounds'],
+        'pairings': [
+            {
+                'board': board, 'player1': p1, 'player2': p2,
+                'score1': results[board]['score1'] if board in results else None,
+                'score2': results[board]['score2'] if board in results else None,
+            }
+            for board, (p1, p2) in enumerate(pairings, 1)
+        ],
+        'byes': byes,
+        'standings': standings,
+        'cross_table': {'players': names, 'rows': cross_table(names, entry['matches']).values.tolist()},
+    }
+
+
+def _etag(tournament_id, version):
+    return f'"c{version}"' if tournament_id is None else f'"t{tournament_id}-{version}"'
+
+
+def _encode(value):
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+class Unavailable(Exception):
+    """The database or tournament exists but must be upgraded by the app before it can be served."""
+
+
+class SnapshotStore:
+    """Encoded response bodies keyed by tournament (or catalog) version.
+
+    One connection serves every request thread; the lock is held only for
+    the version query and, after a write, for one rebuild.
+    """
+
+    def __init__(self, db_path=storage.DB_PATH):
+        self.conn = storage.connect_readonly(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._cache = TournamentCache(migrate=False)
+        self._bodies = {}
+
+    def _version(self, tournament_id):
+        # Tables or columns missing from an old schema surface as OperationalError.
+        try:
+            if tournament_id is None:
+                return storage.catalog_version(self.conn)
+            if storage.needs_migration(self.conn, tournament_id):
+                raise Unavailable(f"Tournament {tournament_id} has not been converted to the current format yet.")
+            return storage.tournament_version(self.conn, tournament_id)
+        except sqlite3.OperationalError as exc:
+            raise Unavailable(f"The database has not been upgraded to the current schema yet ({exc}).") from exc
+
+    def etag(self, tournament_id=None):
+        """Current ETag of a tournament, or of the list without an id; None if there is no such tournament.
+
+        Raises Unavailable if it cannot be served before the app upgrades it.
+        """
+        with self._lock:
+            version = self._version(tournament_id)
+        return None if version is None else _etag(tournament_id, version)
+
+    def body(self, tournament_id=None):
+        """Return (etag, body bytes), or None if the tournament does not exist.
+
+        Raises Unavailable like etag().
+        """
+        with self._lock:
+            version = self._version(tournament_id)
+            if tournament_id is None:
+                key, build = 'catalog', self._catalog_body
+            else:
+                if version is None:
+                    self._bodies.pop(tournament_id, None)
+                    return None
+                key, build = tournament_id, lambda: self._tournament_body(tournament_id)
+            cached = self._bodies.get(key)
+            if cached is None or cached[0] != version:
+                try:
+                    cached = build()
+                except sqlite3.OperationalError as exc:
+                    raise Unavailable(f"The database has not been upgraded to the current schema yet ({exc}).") from exc
+                if cached is None:
+                    return None
+                self._bodies[key] = cached
+        return _etag(tournament_id, cached[0]), cached[1]
+
+    def _catalog_body(self):
+        with storage.read_snapshot(self.conn):
+            version = storage.catalog_version(self.conn)
+            rows = storage.list_tournaments(self.conn)
+        return version, _encode([{'id': i, 'name': name, 'created_date': created} for i, name, created in rows])
+
+    def _tournament_body(self, tournament_id):
+        entry = self._cache.tournament(self.conn, tournament_id)
+        if entry is None:
+            return None
+        return entry['version'], _encode(snapshot(entry))
+
+    def close(self):
+        self.conn.close()
+
+
+class SpectatorHandler(BaseHTTPRequestHandler):
+    server_version = 'CroquetSpectator/1.0'
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        path = self.path.split('?', 1)[0]
+        if path.rstrip('/') == '/tournaments':
+            tournament_id = None
+        else:
+            match = TOURNAMENT_PATH.match(path)
+            if match is None:
+                return self._error(HTTPStatus.NOT_FOUND, "Unknown path.")
+            tournament_id = int(match.group(1))
+
+        store = self.server.snapshots
+        try:
+            etag = store.etag(tournament_id)
+            if etag is None:
+                return self._error(HTTPStatus.NOT_FOUND, f"Tournament {tournament_id} not found.")
+            if etag in (tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self._common_headers(etag)
+                self.end_headers()
+                return
+            result = store.body(tournament_id)
+        except Unavailable as exc:
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, str(exc))
+        if result is None:
+            return self._error(HTTPStatus.NOT_FOUND, f"Tournament {tournament_id} not found.")
+        etag, body = result
+        self.send_response(HTTPStatus.OK)
+        self._common_headers(etag)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _common_headers(self, etag):
+        self.send_header('ETag', etag)
+        # Clients may keep the body but must revalidate it on every refresh.
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+
+    def _error(self, status, message):
+        body = _encode({'error': message})
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def make_server(db_path=storage.DB_PATH, host='127.0.0.1', port=DEFAULT_PORT):
+    """Return a ThreadingHTTPServer serving db_path; call serve_forever() on it."""
+    server = ThreadingHTTPServer((host, port), SpectatorHandler)
+    server.daemon_threads = True
+    server.snapshots = SnapshotStore(db_path)
+    return server
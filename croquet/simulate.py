@@ -0,0 +1,198 @@
+"""Monte Carlo simulation of whole tournaments.
+
+Each synthetic tournament gives its players hidden strengths, pairs every
+round with generate_pairings, draws first-to-7 results from the strength
+gap and ranks the field with sort_key, exactly as the app would. Batches
+of tournaments run in a process pool; one summary row per tournament is
+streamed to CSV or Parquet as batches finish, so memory stays flat however
+many tournaments are run.
+"""
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from .engine import WINNING_SCORE, generate_pairings, score_round
+from .players import PlayerStore
+
+RESULT_COLUMNS = ['seed', 'players', 'rounds', 'repeat_pairings', 'max_byes', 'byes_spread',
+                  'spearman', 'top1_correct', 'top3_overlap', 'elapsed_ms']
+
+
+def play_match(rng, strength1, strength2):
+    """Draw a first-to-7 score; the stronger player wins more often."""
+    p_win1 = 1.0 / (1.0 + np.exp(strength2 - strength1))
+    loser_hoops = int(rng.integers(0, WINNING_SCORE))
+    if rng.random() < p_win1:
+        return WINNING_SCORE, loser_hoops
+    return loser_hoops, WINNING_SCORE
+
+
+def _rank_positions(order):
+    ranks = np.empty(len(order), dtype=np.float64)
+    ranks[np.asarray(order, dtype=np.intp)] = np.arange(len(order))
+    return ranks
+
+
+def simulate_tournament(seed, num_players, num_rounds, spread=1.0):
+    """Play one synthetic tournament and return its summary row."""
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    strengths = rng.normal(0.0, spread, num_players)
+    players = PlayerStore([f"P{i}" for i in range(num_players)])
+    byes = np.zeros(num_players, dtype=np.int64)
+    repeats = 0
+
+    for round_num in range(1, num_rounds + 1):
+        pairings, round_byes, _ = generate_pairings(players, modifying=False)
+        for p1, p2 in pairings:
+            repeats += bool(players.play_count[players.index[p1], players.index[p2]])
+        for b in round_byes:
+            byes[players.index[b]] += 1
+        results = {
+            (p1, p2): play_match(rng, strengths[players.index[p1]], strengths[players.index[p2]])
+            for p1, p2 in pairings
+        }
+        score_round(players, round_num, pairings, results)
+
+    final = players.ranking()
+    truth = np.argsort(-strengths, kind='stable')
+    if num_players > 1:
+        spearman = float(np.corrcoef(_rank_positions(final), _rank_positions(truth))[0, 1])
+    else:
+        spearman = 1.0
+    return {
+        'seed': seed,
+        'players': num_players,
+        'rounds': num_rounds,
+        'repeat_pairings': repeats,
+        'max_byes': int(byes.max()) if num_players else 0,
+        'byes_spread': int(byes.max() - byes.min()) if num_players else 0,
+        'spearman': round(spearman, 6),
+        'top1_correct': bool(final[0] == truth[0]) if num_players else False,
+        'top3_overlap': len(set(final[:3]) & set(truth[:3].tolist())),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def _run_batch(seeds, num_players, num_rounds, spread):
+    return [simulate_tournament(seed, num_players, num_rounds, spread) for seed in seeds]
+
+
+class _CsvSink:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=RESULT_COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow") from None
+        self._pa = pa
+        self._path = path
+        self._pq = pq
+        self._writer = None
+
+    def write(self, rows):
+        table = self._pa.Table.from_pylist(rows)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_sink(path):
+    """Return a row sink for path, chosen by its extension (.csv or .parquet)."""
+    if path.endswith('.parquet'):
+        return _ParquetSink(path)
+    return _CsvSink(path)
+
+
+class Summary:
+    """Running aggregates over every simulated tournament."""
+
+    def __init__(self):
+        self.tournaments = 0
+        self.pairings = 0
+        self.repeat_pairings = 0
+        self.byes_spread = {}
+        self.spearman_total = 0.0
+        self.top1_correct = 0
+        self.elapsed = 0.0
+
+    def add(self, row):
+        self.tournaments += 1
+        self.pairings += (row['players'] // 2) * row['rounds']
+        self.repeat_pairings += row['repeat_pairings']
+        self.byes_spread[row['byes_spread']] = self.byes_spread.get(row['byes_spread'], 0) + 1
+        self.spearman_total += row['spearman']
+        self.top1_correct += row['top1_correct']
+
+    def as_dict(self):
+        n = max(self.tournaments, 1)
+        return {
+            'tournaments': self.tournaments,
+            'tournaments_per_sec': self.tournaments / self.elapsed if self.elapsed else 0.0,
+            'repeat_rate': self.repeat_pairings / self.pairings if self.pairings else 0.0,
+            'byes_spread': dict(sorted(self.byes_spread.items())),
+            'mean_spearman': self.spearman_total / n,
+            'top1_accuracy': self.top1_correct / n,
+        }
+
+
+def run(num_tournaments, num_players, num_rounds, output=None, workers=None, batch_size=50,
+        spread=1.0, seed=0):
+    """Simulate num_tournaments tournaments and return the summary dict.
+
+    Batches of batch_size seeds are spread over workers processes (all cores
+    by default) with at most two batches per worker in flight. Rows are
+    written to output as each batch completes when a path is given.
+    """
+    workers = workers or os.cpu_count() or 1
+    sink = open_sink(output) if output else None
+    summary = Summary()
+    started = time.perf_counter()
+    seeds = iter(range(seed, seed + num_tournaments))
+
+    def next_batch():
+        return [s for _, s in zip(range(batch_size), seeds)]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            while True:
+                while len(pending) < 2 * workers:
+                    batch = next_batch()
+                    if not batch:
+                        break
+                    pending.add(pool.submit(_run_batch, batch, num_players, num_rounds, spread))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows = future.result()
+                    for row in rows:
+                        summary.add(row)
+                    if sink is not None:
+                        sink.write(rows)
+    finally:
+        if sink is not None:
+            sink.close()
+    summary.elapsed = time.perf_counter() - started
+    return summary.as_dict()
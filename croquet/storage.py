@@ -0,0 +1,918 @@
+import queue
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+
+from . import codec, engine
+from .players import PlayerStore
+from .ranking import DEFAULT_CHAIN, parse_chain
+
+DB_PATH = 'tournaments.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tournaments
+    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+     name TEXT,
+     created_date TEXT,
+     num_rounds INTEGER,
+     current_round INTEGER DEFAULT 1,
+     pairing_method TEXT,
+     version INTEGER NOT NULL DEFAULT 0,
+     tiebreaks TEXT);
+CREATE TABLE IF NOT EXISTS meta
+    (key TEXT PRIMARY KEY,
+     value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS players
+    (tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+     position INTEGER NOT NULL,
+     name TEXT NOT NULL,
+     PRIMARY KEY (tournament_id, position),
+     UNIQUE (tournament_id, name));
+CREATE TABLE IF NOT EXISTS matches
+    (id INTEGER PRIMARY KEY,
+     tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+     round INTEGER NOT NULL,
+     player1 TEXT NOT NULL,
+     player2 TEXT NOT NULL,
+     score1 INTEGER NOT NULL,
+     score2 INTEGER NOT NULL,
+     board INTEGER,
+     version INTEGER NOT NULL DEFAULT 1,
+     UNIQUE (tournament_id, round, player1, player2));
+CREATE TABLE IF NOT EXISTS byes
+    (tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+     round INTEGER NOT NULL,
+     player TEXT NOT NULL,
+     PRIMARY KEY (tournament_id, round, player));
+CREATE TABLE IF NOT EXISTS standings
+    (tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+     round INTEGER NOT NULL,
+     rank INTEGER NOT NULL,
+     name TEXT NOT NULL,
+     games_played INTEGER,
+     wins INTEGER,
+     losses INTEGER,
+     hoops_scored INTEGER,
+     hoops_conceded INTEGER,
+     net_hoops INTEGER,
+     points REAL,
+     win_percentage REAL,
+     PRIMARY KEY (tournament_id, round, rank));
+CREATE TABLE IF NOT EXISTS pairings
+    (tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+     round INTEGER NOT NULL,
+     board INTEGER NOT NULL,
+     player1 TEXT NOT NULL,
+     player2 TEXT,
+     is_repeat INTEGER NOT NULL DEFAULT 0,
+     PRIMARY KEY (tournament_id, round, board));
+CREATE INDEX IF NOT EXISTS idx_matches_tournament_round ON matches (tournament_id, round);
+'''
+
+STANDINGS_COLUMNS = ['rank', 'name', 'games_played', 'wins', 'losses', 'hoops_scored',
+                     'hoops_conceded', 'net_hoops', 'points', 'win_percentage']
+MATCH_COLUMNS = ['round', 'player1', 'player2', 'score1', 'score2']
+
+
+BUSY_TIMEOUT_MS = 5000
+# Connections a ConnectionPool keeps open at most.
+POOL_SIZE = 8
+# Attempts record_result makes when another write gets in between its read and its write.
+WRITE_RETRIES = 5
+
+
+def connect(path=DB_PATH, check_same_thread=True):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=check_same_thread)
+    # WAL lets readers proceed while a scorer's write is in flight, and
+    # NORMAL sync is safe under WAL while avoiding an fsync per commit.
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA foreign_keys = ON')
+    return conn
+
+
+def connect_readonly(path=DB_PATH, check_same_thread=True):
+    """Open an existing database for reading only; nothing is created or migrated."""
+    uri = Path(path).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=check_same_thread)
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    return conn
+
+
+class _Lease:
+    """A pooled connection held by one thread; returned when the thread drops it."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+
+class ConnectionPool:
+    """A bounded pool of connections to one database file, shared by threads.
+
+    connection() checks one out on a thread's first call and returns the
+    same one on later calls; it goes back to the pool on release() or when
+    the thread exits. Streamlit runs each rerun on a fresh thread, so a
+    rerun picks up a connection an earlier rerun opened instead of paying
+    for connect() and its PRAGMAs again. When all size connections are
+    checked out, callers wait for one for up to the busy timeout.
+    """
+
+    def __init__(self, path=DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._opened = 0
+        self._closed = False
+
+    def connection(self):
+        lease = getattr(self._local, 'lease', None)
+        if lease is None:
+            conn = self._checkout()
+            lease = _Lease(conn)
+            lease.done = weakref.finalize(lease, self._checkin, conn)
+            self._local.lease = lease
+        return lease.conn
+
+    def release(self):
+        """Return the calling thread's connection to the pool now."""
+        lease = self._local.__dict__.pop('lease', None)
+        if lease is not None:
+            lease.done()
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            opening = self._opened < self.size
+            if opening:
+                self._opened += 1
+        if opening:
+            try:
+                return connect(self.path, check_same_thread=False)
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._idle.get(timeout=BUSY_TIMEOUT_MS / 1000)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"All {self.size} database connections are in use.") from None
+
+    def _checkin(self, conn):
+        if self._closed:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close_all(self):
+        """Close idle connections; ones still checked out are closed when returned."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def init_db(conn):
+    conn.executescript(SCHEMA)
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(tournaments)")}
+    if 'version' not in cols:
+        conn.execute("ALTER TABLE tournaments ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+    if 'tiebreaks' not in cols:
+        conn.execute("ALTER TABLE tournaments ADD COLUMN tiebreaks TEXT")
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(matches)")}
+    if 'board' not in cols:
+        conn.execute("ALTER TABLE matches ADD COLUMN board INTEGER")
+    if 'version' not in cols:
+        conn.execute("ALTER TABLE matches ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('catalog_version', 0)")
+    conn.execute(
+        "INSERT OR IGNORE INTO meta (key, value) SELECT 'version_counter', COALESCE(MAX(version), 0) FROM tournaments"
+    )
+    conn.commit()
+
+
+@contextmanager
+def read_snapshot(conn):
+    """Run several reads against one consistent snapshot of the database."""
+    if conn.in_transaction:
+        yield
+        return
+    conn.execute("BEGIN")
+    try:
+        yield
+    finally:
+        conn.execute("COMMIT")
+
+
+# Versions
+#
+# Every write bumps the tournament's version, and writes that add or remove
+# tournaments also bump the catalog version, so readers can cache by version.
+# Versions come from one database-wide counter, so a tournament created under
+# the id of a deleted one never repeats a (tournament id, version) pair.
+
+def _bump_version(conn, tournament_id):
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key='version_counter'")
+    conn.execute(
+        "UPDATE tournaments SET version = (SELECT value FROM meta WHERE key='version_counter') WHERE id=?",
+        (tournament_id,)
+    )
+
+
+def _bump_catalog(conn):
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key='catalog_version'")
+
+
+def tournament_version(conn, tournament_id):
+    row = conn.execute("SELECT version FROM tournaments WHERE id=?", (tournament_id,)).fetchone()
+    return None if row is None else row[0]
+
+
+def catalog_version(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key='catalog_version'").fetchone()
+    return 0 if row is None else row[0]
+
+
+def list_tournaments(conn):
+    return conn.execute("SELECT id, name, created_date FROM tournaments ORDER BY id").fetchall()
+
+
+# Reads
+
+def load_tournament(conn, tournament_id, migrate=True):
+    # Rows still in the single-row format are converted on first access,
+    # unless the caller only reads and checks needs_migration itself.
+    if migrate:
+        migrate_legacy(conn, tournament_id)
+    row = conn.execute(
+        "SELECT id, name, created_date, num_rounds, current_round, tiebreaks FROM tournaments WHERE id=?",
+        (tournament_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    tourney = dict(zip(['id', 'name', 'created_date', 'num_rounds', 'current_round'], row))
+    tourney['tiebreaks'] = parse_chain(row[5] or ())
+    return tourney
+
+
+def load_tiebreaks(conn, tournament_id):
+    row = conn.execute("SELECT tiebreaks FROM tournaments WHERE id=?", (tournament_id,)).fetchone()
+    return parse_chain(row[0] or ()) if row else DEFAULT_CHAIN
+
+
+def load_matches(conn, tournament_id, round_num=None):
+    """Match rows of the completed rounds, each with its 'version'.
+
+    Boards of the round in play are load_board_results'.
+    """
+    sql = (
+        "SELECT round, player1, player2, score1, score2, version FROM matches WHERE tournament_id=? "
+        "AND round < (SELECT current_round FROM tournaments WHERE id=?)"
+    )
+    params = [tournament_id, tournament_id]
+    if round_num is not None:
+        sql += " AND round=?"
+        params.append(round_num)
+    rows = conn.execute(sql + " ORDER BY round, board, id", params).fetchall()
+    return [dict(zip(MATCH_COLUMNS + ['version'], r)) for r in rows]
+
+
+def latest_standings_round(conn, tournament_id):
+    row = conn.execute("SELECT MAX(round) FROM standings WHERE tournament_id=?", (tournament_id,)).fetchone()
+    return row[0]
+
+
+def standings_rounds(conn, tournament_id):
+    """Rounds with a stored standings snapshot, in order."""
+    return [r[0] for r in conn.execute(
+        "SELECT DISTINCT round FROM standings WHERE tournament_id=? ORDER BY round", (tournament_id,)
+    )]
+
+
+def load_standings(conn, tournament_id, round_num=None):
+    """Standings rows after round_num, defaulting to the latest stored round."""
+    if round_num is None:
+        round_num = latest_standings_round(conn, tournament_id)
+        if round_num is None:
+            return []
+    rows = conn.execute(
+        f"SELECT {', '.join(STANDINGS_COLUMNS)} FROM standings WHERE tournament_id=? AND round=? ORDER BY rank",
+        (tournament_id, round_num)
+    ).fetchall()
+    return [dict(zip(STANDINGS_COLUMNS, r)) for r in rows]
+
+
+def load_byes(conn, tournament_id):
+    rows = conn.execute(
+        "SELECT round, player FROM byes WHERE tournament_id=? ORDER BY round", (tournament_id,)
+    ).fetchall()
+    history = {}
+    for round_num, player in rows:
+        history.setdefault(round_num, []).append(player)
+    return history
+
+
+ARCHIVE_TABLES = {
+    'matches': (MATCH_COLUMNS, 'round, board, id'),
+    'standings': (['round'] + STANDINGS_COLUMNS, 'round, rank'),
+    'byes': (['round', 'player'], 'round, player'),
+}
+
+
+def iter_archive(conn, table, tournament_ids=None, chunk_size=1000):
+    """Yield chunks of (tournament_id, tournament, *columns) rows from table.
+
+    table is 'matches', 'standings' or 'byes'; tournament_ids limits the rows
+    to those tournaments (all of them by default). Rows are fetched chunk_size
+    at a time, so memory does not grow with the size of the archive.
+    """
+    columns, order = ARCHIVE_TABLES[table]
+    # Only completed rounds; results of the round in play are not final yet.
+    where, params = 'WHERE x.round < t.current_round', ()
+    if tournament_ids is not None:
+        tournament_ids = list(tournament_ids)
+        where += f" AND t.id IN ({', '.join('?' * len(tournament_ids))})"
+        params = tuple(tournament_ids)
+    # A dedicated cursor so the caller can interleave other queries.
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT t.id, t.name, {', '.join('x.' + c for c in columns)} "
+        f"FROM {table} x JOIN tournaments t ON t.id = x.tournament_id {where} "
+        f"ORDER BY t.id, {', '.join('x.' + c.strip() for c in order.split(','))}",
+        params
+    )
+    try:
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cur.close()
+
+
+def load_player_names(conn, tournament_id):
+    return [r[0] for r in conn.execute(
+        "SELECT name FROM players WHERE tournament_id=? ORDER BY position", (tournament_id,)
+    )]
+
+
+def load_players(conn, tournament_id, matches=None):
+    if matches is None:
+        matches = load_matches(conn, tournament_id)
+    return build_players(
+        load_player_names(conn, tournament_id), load_standings(conn, tournament_id), matches,
+        load_tiebreaks(conn, tournament_id)
+    )
+
+
+def build_players(names, standings, matches, tiebreaks=DEFAULT_CHAIN):
+    """Rebuild the PlayerStore used by the pairing and stats helpers.
+
+    Aggregates come from the latest standings snapshot and opponents from the
+    match rows, so nothing but names is stored per player.
+    """
+    players = PlayerStore(names, tiebreaks)
+    index = players.index
+    for row in standings:
+        i = index[row['name']]
+        players.score[i] = row['points']
+        for field in ('games_played', 'wins', 'losses', 'hoops_scored', 'hoops_conceded', 'net_hoops'):
+            getattr(players, field)[i] = row[field]
+    players.record_matches(matches)
+    return players
+
+
+# Writes
+
+def create_tournament(conn, name, created_date, num_rounds, player_names, tiebreaks=DEFAULT_CHAIN):
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO tournaments (name, created_date, num_rounds, current_round, tiebreaks) VALUES (?, ?, ?, 1, ?)",
+            (name, created_date, num_rounds, ','.join(tiebreaks))
+        )
+        tournament_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO players (tournament_id, position, name) VALUES (?, ?, ?)",
+            [(tournament_id, i, n) for i, n in enumerate(player_names)]
+        )
+        _bump_version(conn, tournament_id)
+        _bump_catalog(conn)
+    return tournament_id
+
+
+def bulk_create_tournaments(conn, tournaments):
+    """Store complete tournaments in one transaction and return their ids.
+
+    Each tournament is a dict with name, created_date, num_rounds,
+    current_round, players (names), matches, byes ({round: names}) and
+    standings ({round: rows}), as importer.build_tournament returns.
+    """
+    ids = []
+    player_rows, match_rows, bye_rows, standing_rows = [], [], [], []
+    with conn:
+        for t in tournaments:
+            cur = conn.execute(
+                "INSERT INTO tournaments (name, created_date, num_rounds, current_round, tiebreaks) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (t['name'], t['created_date'], t['num_rounds'], t['current_round'],
+                 ','.join(t.get('tiebreaks', DEFAULT_CHAIN)))
+            )
+            tid = cur.lastrowid
+            _bump_version(conn, tid)
+            ids.append(tid)
+            player_rows += [(tid, i, n) for i, n in enumerate(t['players'])]
+            match_rows += [(tid, m['round'], m['player1'], m['player2'], m['score1'], m['score2']) for m in t['matches']]
+            bye_rows += [(tid, r, b) for r, names in t['byes'].items() for b in names]
+            standing_rows += [
+                (tid, r, *(row[c] for c in STANDINGS_COLUMNS)) for r, rows in t['standings'].items() for row in rows
+            ]
+        conn.executemany("INSERT INTO players (tournament_id, position, name) VALUES (?, ?, ?)", player_rows)
+        conn.executemany(
+            "INSERT INTO matches (tournament_id, round, player1, player2, score1, score2) VALUES (?, ?, ?, ?, ?, ?)",
+            match_rows
+        )
+        conn.executemany("INSERT INTO byes (tournament_id, round, player) VALUES (?, ?, ?)", bye_rows)
+        conn.executemany(
+            f"INSERT INTO standings (tournament_id, round, {', '.join(STANDINGS_COLUMNS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(STANDINGS_COLUMNS))})",
+            standing_rows
+        )
+        _bump_catalog(conn)
+    return ids
+
+
+def _insert_standings(conn, tournament_id, round_num, standings):
+    conn.execute("DELETE FROM standings WHERE tournament_id=? AND round=?", (tournament_id, round_num))
+    conn.executemany(
+        f"INSERT INTO standings (tournament_id, round, {', '.join(STANDINGS_COLUMNS)}) "
+        f"VALUES (?, ?, {', '.join('?' * len(STANDINGS_COLUMNS))})",
+        [(tournament_id, round_num, *(row[c] for c in STANDINGS_COLUMNS)) for row in standings]
+    )
+
+
+def load_pairings(conn, tournament_id, round_num):
+    """Stored (pairings, byes, has_repeat) for round_num, or None if not paired yet.
+
+    A bye is stored as a board with no player2.
+    """
+    rows = conn.execute(
+        "SELECT player1, player2, is_repeat FROM pairings WHERE tournament_id=? AND round=? ORDER BY board",
+        (tournament_id, round_num)
+    ).fetchall()
+    if not rows:
+        return None
+    pairings = [(p1, p2) for p1, p2, _ in rows if p2 is not None]
+    byes = [p1 for p1, p2, _ in rows if p2 is None]
+    return pairings, byes, any(r for _, p2, r in rows if p2 is not None)
+
+
+def save_pairings(conn, tournament_id, round_num, pairings, byes, played, replace=False):
+    """Store the pairings for round_num and return what is stored afterwards.
+
+    played is the PlayerStore the pairings were made from, used to flag repeat
+    boards. Unless replace is set, pairings another session stored first win,
+    so every session serves the same boards.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if replace:
+            if load_board_results(conn, tournament_id, round_num):
+                raise ValueError(f"Round {round_num} already has results and cannot be re-paired.")
+            conn.execute("DELETE FROM pairings WHERE tournament_id=? AND round=?", (tournament_id, round_num))
+        elif conn.execute(
+            "SELECT 1 FROM pairings WHERE tournament_id=? AND round=? LIMIT 1", (tournament_id, round_num)
+        ).fetchone():
+            return load_pairings(conn, tournament_id, round_num)
+        index = played.index
+        rows = [
+            (tournament_id, round_num, board, p1, p2, int(played.play_count[index[p1], index[p2]] > 0))
+            for board, (p1, p2) in enumerate(pairings, 1)
+        ]
+        rows += [(tournament_id, round_num, len(pairings) + i, b, None, 0) for i, b in enumerate(byes, 1)]
+        conn.executemany(
+            "INSERT INTO pairings (tournament_id, round, board, player1, player2, is_repeat) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        _bump_version(conn, tournament_id)
+    return load_pairings(conn, tournament_id, round_num)
+
+
+def ensure_pairings(conn, tournament_id, players, round_num, time_budget=None):
+    """Return the stored pairings for round_num, generating them on first use."""
+    stored = load_pairings(conn, tournament_id, round_num)
+    if stored is not None:
+        return stored
+    pairings, byes, _ = engine.generate_pairings(players, modifying=False, time_budget=time_budget)
+    return save_pairings(conn, tournament_id, round_num, pairings, byes, players)
+
+
+def repair_round(conn, tournament_id, players, round_num, time_budget=None):
+    """Discard the stored pairings for round_num and pair it afresh.
+
+    Raises ValueError once any board of the round has a result.
+    """
+    pairings, byes, _ = engine.generate_pairings(players, modifying=False, time_budget=time_budget)
+    return save_pairings(conn, tournament_id, round_num, pairings, byes, players, replace=True)
+
+
+# Per-board results
+#
+# Scorers on different courts write one match row each. A write is a single
+# statement that only applies if the row still has the version the scorer
+# read and the board is still paired in the current round, so concurrent
+# scorers never overwrite each other and nobody holds a lock while reading.
+# The round advances, and its standings are derived from the match rows,
+# once every stored board has a result.
+
+class ResultConflict(ValueError):
+    """Another scorer saved a different result for the board first."""
+
+
+def load_board_results(conn, tournament_id, round_num):
+    """Return {board: match dict with 'version'} for the boards of round_num that have a result."""
+    rows = conn.execute(
+        "SELECT p.board, m.player1, m.player2, m.score1, m.score2, m.version "
+        "FROM pairings p JOIN matches m ON m.tournament_id = p.tournament_id AND m.round = p.round "
+        "AND m.player1 = p.player1 AND m.player2 = p.player2 "
+        "WHERE p.tournament_id=? AND p.round=? ORDER BY p.board",
+        (tournament_id, round_num)
+    ).fetchall()
+    return {
+        board: {'round': round_num, 'player1': p1, 'player2': p2, 'score1': s1, 'score2': s2, 'version': v}
+        for board, p1, p2, s1, s2, v in rows
+    }
+
+
+def record_result(conn, tournament_id, round_num, board, score1, score2, expected_version=None):
+    """Save one board's result and advance the round if it was the last one.
+
+    expected_version is the version of the board's result the scorer saw,
+    0 for none yet; if it has changed since, ResultConflict is raised. Without
+    it, a write that loses a race is simply retried. Raises ValueError if the
+    score is not first to 7 or the board is not one of the current round's
+    games, and returns True if this result completed the round.
+    """
+    engine.match_winner(score1, score2)
+    for _ in range(WRITE_RETRIES):
+        row = conn.execute(
+            "SELECT p.player1, p.player2, t.current_round FROM pairings p JOIN tournaments t ON t.id = p.tournament_id "
+            "WHERE p.tournament_id=? AND p.round=? AND p.board=?",
+            (tournament_id, round_num, board)
+        ).fetchone()
+        if row is None or row[1] is None or row[2] != round_num:
+            raise ValueError(f"Board {board} is not a game of the current round; reload the page.")
+        p1, p2, _ = row
+        stored = load_board_results(conn, tournament_id, round_num).get(board)
+        version = stored['version'] if stored else 0
+        if expected_version is not None and version != expected_version:
+            if stored is None:
+                raise ResultConflict(f"Board {board} ({p1} vs {p2}) has no saved result; reload the page.")
+            raise ResultConflict(
+                f"Board {board} ({p1} vs {p2}) was just saved as {stored['score1']}-{stored['score2']} "
+                f"by another scorer; reload the page."
+            )
+        still_paired = (
+            "EXISTS (SELECT 1 FROM pairings p JOIN tournaments t ON t.id = p.tournament_id "
+            "WHERE p.tournament_id=? AND p.round=? AND p.board=? AND p.player1=? AND p.player2=? "
+            "AND t.current_round=p.round)"
+        )
+        with conn:
+            if stored is None:
+                try:
+                    cur = conn.execute(
+                        "INSERT INTO matches (tournament_id, round, player1, player2, score1, score2, board) "
+                        f"SELECT ?, ?, ?, ?, ?, ?, ? WHERE {still_paired}",
+                        (tournament_id, round_num, p1, p2, score1, score2, board,
+                         tournament_id, round_num, board, p1, p2)
+                    )
+                except sqlite3.IntegrityError:
+                    continue
+            else:
+                cur = conn.execute(
+                    "UPDATE matches SET score1=?, score2=?, version = version + 1 "
+                    f"WHERE tournament_id=? AND round=? AND player1=? AND player2=? AND version=? AND {still_paired}",
+                    (score1, score2, tournament_id, round_num, p1, p2, version,
+                     tournament_id, round_num, board, p1, p2)
+                )
+            if cur.rowcount == 0:
+                continue
+            _bump_version(conn, tournament_id)
+        return complete_round(conn, tournament_id, round_num)
+    raise ResultConflict(f"Board {board} is being saved by several scorers at once; try again.")
+
+
+def complete_round(conn, tournament_id, round_num):
+    """Store byes and standings and advance past round_num if every board has a result.
+
+    Returns True if the round was advanced by this call.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        current = conn.execute("SELECT current_round FROM tournaments WHERE id=?", (tournament_id,)).fetchone()
+        stored = load_pairings(conn, tournament_id, round_num)
+        if current is None or current[0] != round_num or stored is None:
+            return False
+        pairings, byes, _ = stored
+        results = load_board_results(conn, tournament_id, round_num)
+        if len(results) < len(pairings):
+            return False
+        round_matches = [{c: m[c] for c in MATCH_COLUMNS} for m in results.values()]
+        before = load_matches(conn, tournament_id)
+        players, from_round = _players_before(conn, tournament_id, before, round_num)
+        snapshots = engine.recompute_standings(players, before + round_matches, from_round, round_num)
+        conn.executemany(
+            "INSERT OR IGNORE INTO byes (tournament_id, round, player) VALUES (?, ?, ?)",
+            [(tournament_id, round_num, b) for b in byes]
+        )
+        for snapshot_round, standings in snapshots.items():
+            _insert_standings(conn, tournament_id, snapshot_round, standings)
+        conn.execute("UPDATE tournaments SET current_round=? WHERE id=?", (round_num + 1, tournament_id))
+        _bump_version(conn, tournament_id)
+    return True
+
+
+def record_round(conn, tournament_id, round_num, new_matches, byes, standings):
+    """Store one round's results, byes and standings and advance the round.
+
+    Raises ValueError if round_num is not the tournament's current round,
+    the matches are not the boards stored for it or some boards already have
+    results saved with record_result.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        current = conn.execute("SELECT current_round FROM tournaments WHERE id=?", (tournament_id,)).fetchone()
+        if current is None or current[0] != round_num:
+            raise ValueError(f"Round {round_num} is not the current round; it may already have been submitted.")
+        stored = load_pairings(conn, tournament_id, round_num)
+        if stored is not None and (
+            sorted((m['player1'], m['player2']) for m in new_matches) != sorted(stored[0])
+            or sorted(byes) != sorted(stored[1])
+        ):
+            raise ValueError(f"Results do not match the stored pairings for round {round_num}; reload the page.")
+        if load_board_results(conn, tournament_id, round_num):
+            raise ValueError(f"Some boards of round {round_num} already have results; enter the rest board by board.")
+        boards = {pair: board for board, pair in enumerate(stored[0], 1)} if stored is not None else {}
+        conn.executemany(
+            "INSERT INTO matches (tournament_id, round, player1, player2, score1, score2, board) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(tournament_id, m['round'], m['player1'], m['player2'], m['score1'], m['score2'],
+              boards.get((m['player1'], m['player2']))) for m in new_matches]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO byes (tournament_id, round, player) VALUES (?, ?, ?)",
+            [(tournament_id, round_num, b) for b in byes]
+        )
+        _insert_standings(conn, tournament_id, round_num, standings)
+        conn.execute("UPDATE tournaments SET current_round=? WHERE id=?", (round_num + 1, tournament_id))
+        _bump_version(conn, tournament_id)
+
+
+def _update_matches(conn, tournament_id, edited_matches, standings_by_round):
+    """Overwrite edited scores and replace the standings snapshots of the given rounds.
+
+    Runs inside the caller's transaction. Each edited match carries the
+    'version' the editor was shown; if another write has changed it since,
+    ResultConflict is raised and the transaction is rolled back.
+    """
+    for m in edited_matches:
+        cur = conn.execute(
+            "UPDATE matches SET score1=?, score2=?, version = version + 1 "
+            "WHERE tournament_id=? AND round=? AND player1=? AND player2=? AND version=?",
+            (m['score1'], m['score2'], tournament_id, m['round'], m['player1'], m['player2'], m['version'])
+        )
+        if cur.rowcount == 0:
+            raise ResultConflict(
+                f"Round {m['round']} ({m['player1']} vs {m['player2']}) was just changed "
+                f"by another scorer; reload the page."
+            )
+    for round_num, standings in standings_by_round.items():
+        _insert_standings(conn, tournament_id, round_num, standings)
+    _bump_version(conn, tournament_id)
+
+
+def edit_results(conn, tournament_id, edited_matches, shown_matches=None):
+    """Save edited scores, refreshing only the standings they affect.
+
+    shown_matches are the matches as the editor displayed them, with the
+    'version' load_matches returned. Edits are detected against their scores
+    and a match is written only if it is still at the version shown; if
+    another save has changed it since, ResultConflict is raised and nothing
+    is written. Without shown_matches, edits are compared with the stored
+    matches as they are now.
+
+    Aggregates resume from the standings snapshot of the round before the
+    earliest change, so snapshots of earlier rounds stay as they are; a
+    snapshot that does not add up to its matches is not trusted and the whole
+    tournament is replayed instead. The matches are read, replayed and written
+    in one write transaction, so a round completed meanwhile is either all in
+    or all out of the replay. Raises ValueError for a score that is not first
+    to 7 or a match that was never played, and returns the number of matches
+    changed.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        matches = load_matches(conn, tournament_id)
+        shown = {(m['round'], m['player1'], m['player2']): m for m in shown_matches or matches}
+        changed = engine.changed_matches(shown.values(), edited_matches)
+        if not changed:
+            return 0
+        engine.validate_matches(changed)
+        stored = {(m['round'], m['player1'], m['player2']) for m in matches}
+        edits = {}
+        for m in changed:
+            key = (m['round'], m['player1'], m['player2'])
+            if key not in shown or key not in stored:
+                raise ValueError(f"Round {m['round']} has no game {m['player1']} vs {m['player2']}.")
+            edits[key] = dict(m, version=shown[key]['version'])
+        matches = [edits.get((m['round'], m['player1'], m['player2']), m) for m in matches]
+
+        from_round = min(m['round'] for m in changed)
+        last_round = max(m['round'] for m in matches)
+        players, from_round = _players_before(conn, tournament_id, matches, from_round)
+        snapshots = engine.recompute_standings(players, matches, from_round, last_round)
+        _update_matches(conn, tournament_id, edits.values(), snapshots)
+    return len(changed)
+
+
+def _players_before(conn, tournament_id, matches, from_round):
+    """Return (players as of the end of round from_round - 1, round to replay from).
+
+    Aggregates resume from that round's standings snapshot; a snapshot that
+    does not add up to its matches is not trusted and replay starts at round 1.
+    """
+    names = load_player_names(conn, tournament_id)
+    tiebreaks = load_tiebreaks(conn, tournament_id)
+    before = [m for m in matches if m['round'] < from_round]
+    checkpoint = load_standings(conn, tournament_id, from_round - 1) if before else []
+    players = build_players(names, checkpoint, before, tiebreaks)
+    if not engine.checkpoint_consistent(players, before):
+        return build_players(names, [], [], tiebreaks), 1
+    return players, from_round
+
+
+def delete_tournament(conn, tournament_id):
+    with conn:
+        conn.execute("DELETE FROM tournaments WHERE id=?", (tournament_id,))
+        _bump_catalog(conn)
+
+
+# Migration from the single-row format
+
+LEGACY_COLUMNS = ('players', 'matches', 'standings', 'byes')
+
+
+def _legacy_columns(conn):
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(tournaments)")}
+    return all(c in cols for c in LEGACY_COLUMNS)
+
+
+def needs_migration(conn, tournament_id):
+    """True if the tournament is still stored in the single-row blob format."""
+    if not _legacy_columns(conn):
+        return False
+    return conn.execute(
+        "SELECT 1 FROM tournaments WHERE id=? AND players IS NOT NULL", (tournament_id,)
+    ).fetchone() is not None
+
+
+def migrate_legacy(conn, tournament_id=None):
+    """Move tournaments stored as blobs into the relational tables.
+
+    Blobs may be legacy repr() strings or codec-encoded values. Returns the
+    number of tournaments converted; converted rows have their blob columns
+    cleared, so running this again is a no-op. Each tournament is re-read
+    and converted under its own write lock, so sessions opening the same
+    legacy tournament at once convert it exactly once.
+    """
+    if not _legacy_columns(conn):
+        return 0
+    sql = "SELECT id FROM tournaments WHERE players IS NOT NULL"
+    params = ()
+    if tournament_id is not None:
+        sql += " AND id=?"
+        params = (tournament_id,)
+    converted = 0
+    for (legacy_id,) in conn.execute(sql, params).fetchall():
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if _migrate_row(conn, legacy_id):
+                converted += 1
+    return converted
+
+
+def _migrate_row(conn, tournament_id):
+    """Convert one blob row inside the caller's write transaction.
+
+    Returns False if another connection converted it first.
+    """
+    row = conn.execute(
+        "SELECT current_round, players, matches, standings, byes FROM tournaments WHERE id=? AND players IS NOT NULL",
+        (tournament_id,)
+    ).fetchone()
+    if row is None:
+        return False
+    current_round, players, matches, standings, byes = row
+    players = codec.decode(players)
+    matches = codec.decode(matches) or []
+    standings_history = codec.decode(standings) or []
+    byes_history = codec.decode(byes) or []
+    completed = current_round - 1
+
+    # Snapshots were appended per round and per edit; place each one by the
+    # number of games it covers and keep the last snapshot of every round.
+    cumulative = {}
+    total = 0
+    for round_num in sorted({m['round'] for m in matches}):
+        total += sum(1 for m in matches if m['round'] == round_num)
+        cumulative[total] = round_num
+    by_round = {}
+    for snapshot in standings_history:
+        games = sum(row['games_played'] for row in snapshot) // 2
+        if games in cumulative:
+            by_round[cumulative[games]] = snapshot
+
+    # The creation-time bye list precedes one entry per completed round.
+    round_byes = byes_history[-completed:] if completed > 0 else []
+
+    conn.executemany(
+        "INSERT INTO players (tournament_id, position, name) VALUES (?, ?, ?)",
+        [(tournament_id, i, p['name']) for i, p in enumerate(players)]
+    )
+    conn.executemany(
+        "INSERT INTO matches (tournament_id, round, player1, player2, score1, score2) VALUES (?, ?, ?, ?, ?, ?)",
+        [(tournament_id, m['round'], m['player1'], m['player2'], m['score1'], m['score2']) for m in matches]
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO byes (tournament_id, round, player) VALUES (?, ?, ?)",
+        [(tournament_id, r, b) for r, names in enumerate(round_byes, 1) for b in names]
+    )
+    for round_num, snapshot in by_round.items():
+        _insert_standings(conn, tournament_id, round_num, [
+            {**row, 'win_percentage': row.get('win_percentage', 0.0)} for row in snapshot
+        ])
+    conn.execute(
+        "UPDATE tournaments SET players=NULL, matches=NULL, standings=NULL, byes=NULL WHERE id=?",
+        (tournament_id,)
+    )
+    _bump_version(conn, tournament_id)
+    return True
+
+
+# Portable snapshots
+
+def export_state(conn, tournament_id, codec_name=codec.DEFAULT_CODEC):
+    """Encode one tournament, player opponents included, as a codec blob."""
+    tourney = load_tournament(conn, tournament_id)
+    if tourney is None:
+        return None
+    matches = load_matches(conn, tournament_id)
+    rounds = standings_rounds(conn, tournament_id)
+    return codec.encode({
+        'tournament': tourney,
+        'players': load_players(conn, tournament_id, matches).to_dicts(),
+        'matches': [{c: m[c] for c in MATCH_COLUMNS} for m in matches],
+        'byes': load_byes(conn, tournament_id),
+        'standings': {r: load_standings(conn, tournament_id, r) for r in rounds},
+    }, codec_name)
+
+
+def import_state(conn, data):
+    """Create a new tournament from an export_state blob and return its id."""
+    state = codec.decode(data)
+    tourney = state['tournament']
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO tournaments (name, created_date, num_rounds, current_round, tiebreaks) VALUES (?, ?, ?, ?, ?)",
+            (tourney['name'], tourney['created_date'], tourney['num_rounds'], tourney['current_round'],
+             ','.join(tourney.get('tiebreaks', DEFAULT_CHAIN)))
+        )
+        tournament_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO players (tournament_id, position, name) VALUES (?, ?, ?)",
+            [(tournament_id, i, p['name']) for i, p in enumerate(state['players'])]
+        )
+        conn.executemany(
+            "INSERT INTO matches (tournament_id, round, player1, player2, score1, score2) VALUES (?, ?, ?, ?, ?, ?)",
+            [(tournament_id, m['round'], m['player1'], m['player2'], m['score1'], m['score2']) for m in state['matches']]
+        )
+        conn.executemany(
+            "INSERT INTO byes (tournament_id, round, player) VALUES (?, ?, ?)",
+            [(tournament_id, int(r), b) for r, names in state['byes'].items() for b in names]
+        )
+        for round_num, rows in state['standings'].items():
+            _insert_standings(conn, tournament_id, int(round_num), rows)
+        _bump_version(conn, tournament_id)
+        _bump_catalog(conn)
+    return tournament_id
@@ -0,0 +1,100 @@
+"""Lightweight per-rerun timing spans.
+
+A RerunTimer collects named wall-time spans for one pass over the app
+script. finish() logs one structured JSON line on the ``croquet.timing``
+logger and returns the record, which a TimingHistory keeps for the last
+few reruns. A timer can optionally run cProfile for its whole lifetime and
+dump the stats when it finishes.
+"""
+import cProfile
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger('croquet.timing')
+
+
+def configure_logging(level=logging.INFO, stream=None):
+    """Send the per-rerun records to stderr (or stream), once per process."""
+    if not logger.handlers:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+
+
+class RerunTimer:
+    def __init__(self, profile_path=None):
+        self.started = self.last_mark = time.perf_counter()
+        self.spans = {}
+        self.context = {}
+        self.finished = False
+        self.profile_path = profile_path
+        self._profiler = None
+        if profile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block; repeated names accumulate."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.last_mark = time.perf_counter()
+            self.spans[name] = self.spans.get(name, 0.0) + self.last_mark - started
+
+    def note(self, **context):
+        """Attach fields such as tournament_id, players or round to the record."""
+        self.context.update(context)
+
+    def finish(self, status='ok'):
+        """Stop the timer, log its record and return it (None if already finished).
+
+        A timer finished with any status other than 'ok' was cut short, so
+        its total runs only to the end of its last span.
+        """
+        if self.finished:
+            return None
+        self.finished = True
+        ended = time.perf_counter() if status == 'ok' else self.last_mark
+        total = ended - self.started
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile_path)
+        record = {
+            'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'status': status,
+            **self.context,
+            'total_ms': round(total * 1000, 3),
+            'spans_ms': {name: round(s * 1000, 3) for name, s in self.spans.items()},
+        }
+        if self.profile_path:
+            record['profile'] = self.profile_path
+        logger.info(json.dumps(record))
+        return record
+
+
+class TimingHistory:
+    """Thread-safe ring buffer of the most recent rerun records."""
+
+    def __init__(self, maxlen=20):
+        self._records = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        if record is not None:
+            with self._lock:
+                self._records.append(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
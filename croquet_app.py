@@ -1,123 +1,66 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-import itertools
 import csv
-from openpyxl.styles import Alignment
-from openpyxl import load_workbook
+import os
 from datetime import datetime
+from io import BytesIO
+
+from croquet import storage
+from croquet.cache import ExportCache, TournamentCache
+from croquet.codec import CodecError
+from croquet.engine import build_standings
+from croquet.export import XLSX_MIME, cross_table, export_archive, export_batch, standings_xlsx
+from croquet.importer import import_files
+from croquet.players import PlayerStore
+from croquet.ranking import DEFAULT_CHAIN, TIEBREAKS, tiebreak_values
+from croquet.timing import RerunTimer, TimingHistory, configure_logging
+
+PROFILE_DIR = 'profiles'
+# Seconds the pairing search may take before it settles for the best pairing found so far.
+PAIRING_TIME_BUDGET = 10.0
+# Directory that keeps generated exports across restarts; unset keeps them in memory only.
+EXPORT_CACHE_DIR = os.environ.get('CROQUET_EXPORT_CACHE_DIR')
 
 # Database setup
+@st.cache_resource
+def get_db():
+    pool = storage.ConnectionPool(storage.DB_PATH)
+    storage.init_db(pool.connection())
+    return pool
+
+@st.cache_resource
+def get_cache():
+    return TournamentCache()
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache(directory=EXPORT_CACHE_DIR)
+
+@st.cache_resource
+def get_timings():
+    configure_logging()
+    return TimingHistory(maxlen=50)
+
 def init_db():
-    conn = sqlite3.connect('tournaments.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS tournaments
-                 (id INTEGER PRIMARY KEY, name TEXT, created_date TEXT,
-                  players TEXT, num_rounds INTEGER, current_round INTEGER DEFAULT 1,
-                  matches TEXT, standings TEXT, byes TEXT)''')
-    conn.commit()
-    conn.close()
+    get_db()
 
 def get_conn():
-    return sqlite3.connect('tournaments.db')
-
-# Helper functions
-def sort_key(p):
-    return (-p['score'], -p['net_hoops'], -p['hoops_scored'])
-
-def generate_pairings(entities, modifying=True):
-    entity_list = sorted(entities, key=sort_key)
-    n = len(entity_list)
-    best_pairings = []
-    best_byes = []
-    has_repeat = False
-    min_repeats = float('inf')
-
-    if n % 2 == 0:
-        players_indices = list(range(n))
-        possible_pairings = list(itertools.combinations(players_indices, 2))
-        pairing_combinations = []
-        for comb in itertools.combinations(possible_pairings, n // 2):
-            players_covered = set()
-            valid = True
-            for p1, p2 in comb:
-                if p1 in players_covered or p2 in players_covered:
-                    valid = False
-                    break
-                players_covered.add(p1)
-                players_covered.add(p2)
-            if valid and len(players_covered) == n:
-                pairing_combinations.append(comb)
-    else:
-        pairing_combinations = []
-        for bye_idx in range(n):
-            players_indices = [i for i in range(n) if i != bye_idx]
-            possible_pairings = list(itertools.combinations(players_indices, 2))
-            for comb in itertools.combinations(possible_pairings, (n - 1) // 2):
-                players_covered = set()
-                valid = True
-                for p1, p2 in comb:
-                    if p1 in players_covered or p2 in players_covered:
-                        valid = False
-                        break
-                    players_covered.add(p1)
-                    players_covered.add(p2)
-                if valid and len(players_covered) == n - 1:
-                    pairing_combinations.append((comb, bye_idx))
-
-    for comb in pairing_combinations:
-        if n % 2 == 0:
-            pairs = [(entity_list[p1]['name'], entity_list[p2]['name']) for p1, p2 in comb]
-            bye = []
-        else:
-            pairs = [(entity_list[p1]['name'], entity_list[p2]['name']) for p1, p2 in comb[0]]
-            bye = [entity_list[comb[1]]['name']]
-        
-        repeats = 0
-        for p1, p2 in pairs:
-            pl1 = next(p for p in entity_list if p['name'] == p1)
-            if p2 in pl1['opponents']:
-                repeats += 1
-        if repeats < min_repeats:
-            min_repeats = repeats
-            best_pairings = pairs
-            best_byes = bye
-            has_repeat = repeats > 0
-        if repeats == 0:
-            break
-
-    if modifying and best_pairings:
-        for p1, p2 in best_pairings:
-            pl1 = next(p for p in entity_list if p['name'] == p1)
-            pl2 = next(p for p in entity_list if p['name'] == p2)
-            pl1['opponents'].add(p2)
-            pl2['opponents'].add(p1)
-
-    return best_pairings, best_byes, has_repeat
-
-def update_player_stats(pl, s_scored, s_conceded, is_win):
-    pl['games_played'] += 1
-    if is_win:
-        pl['wins'] += 1
-        pl['score'] += 1.0
-    else:
-        pl['losses'] += 1
-    pl['hoops_scored'] += s_scored
-    pl['hoops_conceded'] = s_conceded
-    pl['net_hoops'] = pl['hoops_scored'] - pl['hoops_conceded']
-
-def reset_player_stats(players):
-    for p in players:
-        p['score'] = 0.0
-        p['games_played'] = 0
-        p['wins'] = 0
-        p['losses'] = 0
-        p['hoops_scored'] = 0
-        p['hoops_conceded'] = 0
-        p['net_hoops'] = 0
+    return get_db().connection()
+
+# Timing: a rerun cut short by st.rerun()/st.stop() is closed by the next one
+previous_timer = st.session_state.get('rerun_timer')
+if previous_timer is not None:
+    get_timings().add(previous_timer.finish(status='interrupted'))
+profile_path = None
+if st.session_state.pop('profile_next_rerun', False):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_path = os.path.join(PROFILE_DIR, f"rerun-{datetime.now():%Y%m%d-%H%M%S-%f}.prof")
+timer = RerunTimer(profile_path)
+st.session_state.rerun_timer = timer
 
 # Initialize DB
-init_db()
+with timer.span('init_db'):
+    init_db()
 
 # Streamlit App
 st.markdown("<br>", unsafe_allow_html=True)
@@ -127,8 +70,8 @@ st.title("Croquet Tournament Manager")
 st.sidebar.title("Tournaments")
 
 conn_temp = get_conn()
-tournament_list = pd.read_sql("SELECT id, name, created_date FROM tournaments", conn_temp)
-conn_temp.close()
+with timer.span('tournament_list'):
+    tournament_list = pd.DataFrame(get_cache().tournament_list(conn_temp), columns=['id', 'name', 'created_date'])
 
 if 'selected_id' not in st.session_state:
     st.session_state.selected_id = 0
@@ -149,272 +92,265 @@ else:
     st.session_state.selected_id = 0
 
 if selected_id == 0:
+    timer.note(tournament_id=0)
     with st.form("new_tournament"):
         tourney_name = st.text_input("Tournament Name:")
         num_players = st.number_input("Number of players:", min_value=2, value=4)
         num_rounds = st.number_input("Number of Rounds:", min_value=1, value=5)
+        tiebreaks = st.multiselect(
+            "Rank by (in order):", options=list(TIEBREAKS), default=list(DEFAULT_CHAIN),
+            format_func=lambda key: TIEBREAKS[key][0]
+        )
         submitted = st.form_submit_button("Next: Enter Player Names")
         if submitted and tourney_name:
             st.session_state.num_players = num_players
             st.session_state.num_rounds = num_rounds
             st.session_state.tourney_name = tourney_name
+            st.session_state.tiebreaks = tuple(tiebreaks) or DEFAULT_CHAIN
             st.rerun()
     
     if 'num_players' in st.session_state:
         with st.form("players_form"):
-            players = []
+            player_names = []
             all_names_filled = True
             for i in range(st.session_state.num_players):
                 name = st.text_input(f"Player {i+1} name:", key=f"p{i}")
                 if not name:
                     all_names_filled = False
                 else:
-                    players.append({
-                        'name': name, 'score': 0.0, 'games_played': 0, 'wins': 0, 'losses': 0,
-                        'hoops_scored': 0, 'hoops_conceded': 0, 'net_hoops': 0, 'opponents': set()
-                    })
+                    player_names.append(name)
             create_btn = st.form_submit_button("Create Tournament")
-            if create_btn and all_names_filled:
-                pairings, byes, has_repeat = generate_pairings(players)
+            if create_btn and all_names_filled and len(set(player_names)) < len(player_names):
+                st.warning("Player names must be unique.")
+            elif create_btn and all_names_filled:
+                tiebreaks = st.session_state.get('tiebreaks', DEFAULT_CHAIN)
+                players = PlayerStore(player_names, tiebreaks)
                 conn_temp = get_conn()
-                cur = conn_temp.cursor()
-                cur.execute(
-                    "INSERT INTO tournaments (name, created_date, players, num_rounds, current_round, matches, standings, byes) VALUES (?, ?, ?, ?, 1, ?, ?, ?)",
-                    (st.session_state.tourney_name, datetime.now().isoformat(), str(players), st.session_state.num_rounds, str([]), str([]), str([byes]))
+                new_id = storage.create_tournament(
+                    conn_temp, st.session_state.tourney_name, datetime.now().isoformat(),
+                    st.session_state.num_rounds, players.names, tiebreaks
                 )
-                new_id = cur.lastrowid
-                conn_temp.commit()
-                conn_temp.close()
+                with timer.span('generate_pairings'):
+                    storage.ensure_pairings(conn_temp, new_id, players, 1, PAIRING_TIME_BUDGET)
                 
                 st.success(f"Tournament '{st.session_state.tourney_name}' created!")
                 st.session_state.selected_id = new_id
-                st.session_state.current_pairings = pairings
-                st.session_state.current_byes = byes
-                st.session_state.has_repeat = has_repeat
-                st.session_state.current_round = 1
                 del st.session_state.num_players
                 del st.session_state.num_rounds
                 del st.session_state.tourney_name
+                st.session_state.pop('tiebreaks', None)
                 st.rerun()
             elif create_btn and not all_names_filled:
                 st.warning("Please fill all player names.")
+
+    with st.expander("Import players and results from CSV/XLSX"):
+        st.caption(
+            "Players file: one name per row. Results file: round, player1, player2, score1, score2 "
+            "columns, plus an optional tournament column to import several tournaments at once."
+        )
+        import_name = st.text_input("Tournament name (if the results have no tournament column):", key="import_name")
+        import_rounds = st.number_input("Number of rounds (0 = last round in the results):", min_value=0, value=0, key="import_rounds")
+        players_file = st.file_uploader("Players file:", type=["csv", "xlsx"], key="import_players")
+        results_file = st.file_uploader("Results file:", type=["csv", "xlsx"], key="import_results")
+        if (players_file is not None or results_file is not None) and st.button("Import"):
+            conn_temp = get_conn()
+            try:
+                new_ids = import_files(
+                    conn_temp,
+                    results=results_file, players=players_file, name=import_name, num_rounds=import_rounds or None,
+                    results_filename=results_file.name if results_file else None,
+                    players_filename=players_file.name if players_file else None,
+                )
+            except ValueError as exc:
+                st.error(f"Import failed, nothing was saved: {exc}")
+                st.stop()
+            st.session_state.selected_id = new_ids[0]
+            st.rerun()
+
+    backup_file = st.file_uploader("Restore tournament from backup:", type=["ctm"])
+    if backup_file is not None and st.button("Restore Tournament"):
+        conn_temp = get_conn()
+        try:
+            new_id = storage.import_state(conn_temp, backup_file.getvalue())
+        except (CodecError, KeyError) as exc:
+            st.error(f"Could not read backup: {exc}")
+            st.stop()
+        st.session_state.selected_id = new_id
+        st.rerun()
 else:
     conn_temp = get_conn()
-    tourney_data = pd.read_sql("SELECT * FROM tournaments WHERE id=?", conn_temp, params=(selected_id,))
-    conn_temp.close()
-    if not tourney_data.empty:
-        tourney = tourney_data.iloc[0].to_dict()
-    else:
+    with timer.span('load_tournament'):
+        cached = get_cache().tournament(conn_temp, selected_id)
+    if cached is None:
         st.error("Tournament not found!")
         st.session_state.selected_id = 0
         st.rerun()
         st.stop()
-    
-    players = eval(tourney['players'])
+
+    tourney = cached['tournament']
+    matches = cached['matches']
+    with timer.span('build_players'):
+        players = TournamentCache.players(cached)
+    latest_standings = cached['standings']
     num_rounds = tourney['num_rounds']
     current_round = tourney['current_round']
-    matches = eval(tourney['matches']) if tourney['matches'] else []
-    standings_history = eval(tourney['standings']) if tourney['standings'] else []
-    byes_history = eval(tourney['byes']) if tourney['byes'] else []
+    timer.note(tournament_id=selected_id, players=len(players), round=current_round)
 
     if current_round > num_rounds:
         st.header(f"Tournament: {tourney['name']} - Final Standings")
     else:
         st.header(f"Tournament: {tourney['name']} - Round {current_round} of {num_rounds}")
 
-    # Current Standings
-    st.subheader("Current Standings")
-    if not standings_history:
-        sorted_players = sorted(players, key=sort_key)
-        current_standings = [
-            {
-                'rank': i + 1,
-                'name': p['name'],
-                'games_played': p['games_played'],
-                'wins': p['wins'],
-                'losses': p['losses'],
-                'hoops_scored': p['hoops_scored'],
-                'hoops_conceded': p['hoops_conceded'],
-                'net_hoops': p['net_hoops'],
-                'points': p['score'],
-                'win_percentage': 0.00
-            } for i, p in enumerate(sorted_players)
-        ]
-        df_stand = pd.DataFrame(current_standings)
-    else:
-        df_stand = pd.DataFrame(standings_history[-1])
-        df_stand['win_percentage'] = (df_stand['wins'] / df_stand['games_played'] * 100).round(2).fillna(0.00)
-    
-    st.dataframe(df_stand, use_container_width=True, hide_index=True)
+    # Current Standings; earlier rounds are read from the database only when picked.
+    latest_round = cached['standings_round']
+    standings_round = latest_round
+    if latest_round and latest_round > 1:
+        standings_round = st.selectbox(
+            "Standings after:",
+            options=list(range(latest_round, 0, -1)),
+            format_func=lambda r: f"Round {r} (latest)" if r == latest_round else f"Round {r}",
+            key=f"standings_round_{selected_id}"
+        )
+    st.subheader("Current Standings" if standings_round == latest_round else f"Standings after Round {standings_round}")
+    with timer.span('standings_table'):
+        if standings_round != latest_round:
+            df_stand = pd.DataFrame(storage.load_standings(get_conn(), selected_id, standings_round))
+        elif not latest_standings:
+            df_stand = pd.DataFrame(build_standings(players))
+        else:
+            df_stand = pd.DataFrame(latest_standings)
+            df_stand['win_percentage'] = (df_stand['wins'] / df_stand['games_played'] * 100).round(2).fillna(0.00)
+        # Tiebreaks that are not already a standings column, such as Buchholz.
+        extra = [key for key in tourney['tiebreaks'] if key != 'score' and key not in df_stand.columns]
+        if extra and standings_round == latest_round:
+            values = tiebreak_values(players, tourney['tiebreaks'])
+            for key in extra:
+                by_name = dict(zip(players.names, values[key]))
+                df_stand[TIEBREAKS[key][0]] = df_stand['name'].map(by_name)
+        
+        st.dataframe(df_stand, use_container_width=True, hide_index=True)
+
+    if matches:
+        with timer.span('cross_table'), st.expander("Cross Table"):
+            st.dataframe(cross_table([p['name'] for p in players], matches), use_container_width=True)
 
     if current_round <= num_rounds:
-        if 'current_pairings' not in st.session_state or current_round != st.session_state.get('current_round', 0):
-            pairings, byes, has_repeat = generate_pairings(players)
-            st.session_state.current_pairings = pairings
-            st.session_state.current_byes = byes
-            st.session_state.has_repeat = has_repeat
-            st.session_state.current_round = current_round
-        else:
-            pairings = st.session_state.current_pairings
-            byes = st.session_state.current_byes
-            has_repeat = st.session_state.has_repeat
+        # Pairings are made once per round and stored, so every session sees the same boards.
+        stored_pairings = cached['pairings']
+        if stored_pairings is None:
+            with timer.span('generate_pairings'):
+                stored_pairings = storage.ensure_pairings(get_conn(), selected_id, players, current_round, PAIRING_TIME_BUDGET)
+        pairings, byes, has_repeat = stored_pairings
 
         st.subheader(f"Round {current_round} Pairings")
         if has_repeat:
             st.warning("Some repeating pairings this round (unavoidable due to player count).")
-        for i, (p1, p2) in enumerate(pairings, 1):
-            st.write(f"{i}. {p1} vs {p2}")
         if byes:
             for b in byes:
                 st.write(f"{b} gets a bye.")
 
-        with st.form(f"results_round_{current_round}"):
-            result_data = {}
-            for p1, p2 in pairings:
+        # One form per board, so scorers on different courts save independently.
+        board_results = cached['results']
+        # The version of each board's result when this session first showed it.
+        # Saves are checked against it, so a result entered meanwhile on another
+        # device is reported as a conflict instead of being overwritten.
+        seen_versions = st.session_state.setdefault(f"board_versions_{selected_id}_{current_round}", {})
+        if board_results and st.button("Reload boards", help="Show the results other scorers have saved."):
+            seen_versions.clear()
+            st.rerun()
+        for board, (p1, p2) in enumerate(pairings, 1):
+            saved = board_results.get(board)
+            seen_versions.setdefault(board, saved['version'] if saved else 0)
+            with st.form(f"board_{current_round}_{board}"):
+                label = f"{board}. {p1} vs {p2}"
+                st.write(f"{label} — saved {saved['score1']}-{saved['score2']}" if saved else label)
                 col1, col2 = st.columns(2)
                 with col1:
-                    s1 = st.number_input(f"{p1} hoops:", min_value=0, key=f"s1_{p1}_{p2}_{current_round}")
+                    s1 = st.number_input(f"{p1} hoops:", min_value=0, value=saved['score1'] if saved else 0,
+                                         key=f"s1_{p1}_{p2}_{current_round}")
                 with col2:
-                    s2 = st.number_input(f"{p2} hoops:", min_value=0, key=f"s2_{p1}_{p2}_{current_round}")
-                result_data[(p1, p2)] = (s1, s2)
-            submit_results = st.form_submit_button("Submit Results")
-
-            if submit_results:
-                new_matches = []
-                for (p1, p2), (s1, s2) in result_data.items():
-                    if s1 == 7 and s2 < 7:
-                        is_win1 = True
-                    elif s2 == 7 and s1 < 7:
-                        is_win1 = False
-                    else:
-                        st.error("Invalid score: Must be first to 7.")
+                    s2 = st.number_input(f"{p2} hoops:", min_value=0, value=saved['score2'] if saved else 0,
+                                         key=f"s2_{p1}_{p2}_{current_round}")
+                if st.form_submit_button(f"Save Board {board}"):
+                    try:
+                        completed = storage.record_result(
+                            get_conn(), selected_id, current_round, board, s1, s2,
+                            expected_version=seen_versions[board]
+                        )
+                    except ValueError as exc:
+                        st.error(str(exc))
                         st.stop()
-                    
-                    pl1 = next(p for p in players if p['name'] == p1)
-                    pl2 = next(p for p in players if p['name'] == p2)
-                    update_player_stats(pl1, s1, s2, is_win1)
-                    update_player_stats(pl2, s2, s1, not is_win1)
-                    new_matches.append({'round': current_round, 'player1': p1, 'player2': p2, 'score1': s1, 'score2': s2})
-                
-                for p1, p2 in pairings:
-                    pl1 = next(p for p in players if p['name'] == p1)
-                    pl2 = next(p for p in players if p['name'] == p2)
-                    pl1['opponents'].add(p2)
-                    pl2['opponents'].add(p1)
-                
-                matches.extend(new_matches)
-                byes_history.append(byes)
-                
-                sorted_players = sorted(players, key=sort_key)
-                standings_this = [
-                    {
-                        'rank': i + 1,
-                        'name': p['name'],
-                        'games_played': p['games_played'],
-                        'wins': p['wins'],
-                        'losses': p['losses'],
-                        'hoops_scored': p['hoops_scored'],
-                        'hoops_conceded': p['hoops_conceded'],
-                        'net_hoops': p['net_hoops'],
-                        'points': p['score'],
-                        'win_percentage': (p['wins'] / p['games_played'] * 100) if p['games_played'] > 0 else 0.00
-                    } for i, p in enumerate(sorted_players)
-                ]
-                standings_history.append(standings_this)
-                
-                conn_temp = get_conn()
-                conn_temp.execute(
-                    "UPDATE tournaments SET players=?, matches=?, standings=?, byes=?, current_round=? WHERE id=?",
-                    (str(players), str(matches), str(standings_history), str(byes_history), current_round + 1, selected_id)
-                )
-                conn_temp.commit()
-                conn_temp.close()
-                
-                if 'current_pairings' in st.session_state:
-                    del st.session_state.current_pairings
-                    del st.session_state.current_byes
-                    del st.session_state.has_repeat
-                    del st.session_state.current_round
-                
-                if current_round == num_rounds:
-                    st.success("Tournament completed! Final standings updated.")
-                else:
-                    st.success("Results saved! Proceed to next round.")
-                st.rerun()
+                    seen_versions.pop(board)
+                    if completed and current_round == num_rounds:
+                        st.success("Tournament completed! Final standings updated.")
+                    elif completed:
+                        st.success("All boards are in! Proceed to next round.")
+                    st.rerun()
 
-        if current_round < num_rounds and 'current_pairings' not in st.session_state:
-            if st.button("Generate Next Round Pairings"):
-                st.rerun()
+        if not board_results and st.button(
+            f"Re-pair Round {current_round}",
+            help="Discard these pairings and pair the round again from the current standings."
+        ):
+            try:
+                with timer.span('generate_pairings'):
+                    storage.repair_round(get_conn(), selected_id, players, current_round, PAIRING_TIME_BUDGET)
+            except ValueError as exc:
+                st.error(str(exc))
+                st.stop()
+            st.rerun()
+
+    # Exports are cached per tournament version, so unchanged results are not rebuilt.
+    def build_matches_csv():
+        return pd.DataFrame(matches).to_csv(index=False).encode('utf-8')
+
+    def build_standings_xlsx():
+        player_names = [p['name'] for p in players]
+        # Use the latest standings
+        df_s = pd.DataFrame(latest_standings)
+        if not df_s.empty:
+            df_s['win_percentage'] = (df_s['wins'] / df_s['games_played'] * 100).round(2).fillna(0.00)
+        else:
+            df_s = pd.DataFrame(build_standings(players))
+        return standings_xlsx(df_s, cross_table(player_names, matches))
 
-    # Exports
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Export Matches CSV"):
-            df_matches = pd.DataFrame(matches)
-            csv = df_matches.to_csv(index=False)
+            with timer.span('export_csv'):
+                csv = get_export_cache().get(selected_id, cached['version'], 'csv', build_matches_csv)
             st.download_button("Download Matches", csv, "matches.csv", "text/csv")
     with col2:
         if st.button("Export Standings XLSX"):
-            with pd.ExcelWriter('temp_standings.xlsx', engine='openpyxl') as writer:
-                player_names = [p['name'] for p in players]
-                sheet = "Final Standings"
-                # Use the latest standings
-                df_s = pd.DataFrame(standings_history[-1] if standings_history else [])
-                if not df_s.empty:
-                    df_s['win_percentage'] = (df_s['wins'] / df_s['games_played'] * 100).round(2).fillna(0.00)
-                else:
-                    sorted_players = sorted(players, key=sort_key)
-                    df_s = pd.DataFrame([
-                        {
-                            'rank': i + 1,
-                            'name': p['name'],
-                            'games_played': p['games_played'],
-                            'wins': p['wins'],
-                            'losses': p['losses'],
-                            'hoops_scored': p['hoops_scored'],
-                            'hoops_conceded': p['hoops_conceded'],
-                            'net_hoops': p['net_hoops'],
-                            'points': p['score'],
-                            'win_percentage': 0.00
-                        } for i, p in enumerate(sorted_players)
-                    ])
-                
-                cross_table = pd.DataFrame(index=player_names, columns=player_names)
-                cross_table.fillna('', inplace=True)
-                for p in player_names:
-                    cross_table.loc[p, p] = '-'
-                for m in matches:
-                    p1, p2 = m['player1'], m['player2']
-                    s1, s2 = m['score1'], m['score2']
-                    if s1 == 7 and s2 < 7:
-                        cross_table.loc[p1, p2] = f"W {s1}-{s2}"
-                        cross_table.loc[p2, p1] = f"L {s2}-{s1}"
-                    elif s2 == 7 and s1 < 7:
-                        cross_table.loc[p1, p2] = f"L {s1}-{s2}"
-                        cross_table.loc[p2, p1] = f"W {s2}-{s1}"
-                
-                df_s.to_excel(writer, sheet, index=False, startrow=0)
-                cross_table.to_excel(writer, sheet, index=True, startrow=len(df_s) + 2)
-            
-            wb = load_workbook('temp_standings.xlsx')
-            for sheet_name in wb.sheetnames:
-                ws = wb[sheet_name]
-                for row in ws.iter_rows():
-                    for cell in row:
-                        cell.alignment = Alignment(horizontal='center')
-            wb.save('temp_standings.xlsx')
-            with open('temp_standings.xlsx', 'rb') as f:
-                st.download_button("Download Standings", f.read(), "standings.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            with timer.span('export_xlsx'):
+                xlsx = get_export_cache().get(selected_id, cached['version'], 'xlsx', build_standings_xlsx)
+            st.download_button("Download Standings", xlsx, "standings.xlsx", XLSX_MIME)
 
     # Games Played
     if matches:
         st.header("Games Played")
-        with st.form(f"edit_matches_form_{current_round}"):
-            edited_matches = []
-            rounds = sorted(set(match['round'] for match in matches))
-            for round_num in rounds:
-                st.subheader(f"Round {round_num}")
-                round_matches = [m for m in matches if m['round'] == round_num]
+        with timer.span('games_played_table'):
+            st.dataframe(pd.DataFrame(matches, columns=storage.MATCH_COLUMNS), use_container_width=True, hide_index=True)
+
+        # Input widgets exist only for the one round opened for editing.
+        rounds = sorted(set(match['round'] for match in matches))
+        edit_round = st.selectbox(
+            "Edit results of round:",
+            options=[0] + rounds,
+            format_func=lambda r: "-" if r == 0 else f"Round {r}",
+            key=f"edit_round_{selected_id}"
+        )
+        if edit_round:
+            # The round's results as this session first showed them; edits are
+            # measured against these, so a save never reverts another editor's.
+            shown_key = f"edit_shown_{selected_id}_{edit_round}"
+            round_matches = st.session_state.setdefault(
+                shown_key, [dict(m) for m in matches if m['round'] == edit_round]
+            )
+            if st.button("Reload results", help="Show the results other editors have saved."):
+                st.session_state.pop(shown_key)
+                st.rerun()
+            with timer.span('games_played_form'), st.form(f"edit_round_form_{edit_round}"):
+                edited_matches = []
                 for idx, match in enumerate(round_matches):
                     col1, col2, col3, col4 = st.columns([1, 2, 1, 2])
                     with col1:
@@ -424,7 +360,7 @@ else:
                             f"{match['player1']} score",
                             min_value=0,
                             value=match['score1'],
-                            key=f"edit_s1_{idx}_{match['round']}_{match['player1']}_{match['player2']}"
+                            key=f"edit_s1_{idx}_{match['round']}_{match['player1']}_{match['player2']}_{match['version']}"
                         )
                     with col3:
                         st.write(match['player2'])
@@ -433,7 +369,7 @@ else:
                             f"{match['player2']} score",
                             min_value=0,
                             value=match['score2'],
-                            key=f"edit_s2_{idx}_{match['round']}_{match['player1']}_{match['player2']}"
+                            key=f"edit_s2_{idx}_{match['round']}_{match['player1']}_{match['player2']}_{match['version']}"
                         )
                     edited_matches.append({
                         'round': match['round'],
@@ -442,65 +378,94 @@ else:
                         'score1': s1,
                         'score2': s2
                     })
-            
-            update_standings = st.form_submit_button("Update Standings")
-            
-            if update_standings:
-                for match in edited_matches:
-                    if (match['score1'] == 7 and match['score2'] < 7) or (match['score2'] == 7 and match['score1'] < 7):
-                        continue
-                    else:
-                        st.error(f"Invalid score in Round {match['round']} for {match['player1']} vs {match['player2']}: Must be first to 7.")
-                        st.stop()
-                
-                reset_player_stats(players)
-                
-                for match in edited_matches:
-                    pl1 = next(p for p in players if p['name'] == match['player1'])
-                    pl2 = next(p for p in players if p['name'] == match['player2'])
-                    is_win1 = match['score1'] == 7 and match['score2'] < 7
-                    update_player_stats(pl1, match['score1'], match['score2'], is_win1)
-                    update_player_stats(pl2, match['score2'], match['score1'], not is_win1)
                 
-                sorted_players = sorted(players, key=sort_key)
-                standings_this = [
-                    {
-                        'rank': i + 1,
-                        'name': p['name'],
-                        'games_played': p['games_played'],
-                        'wins': p['wins'],
-                        'losses': p['losses'],
-                        'hoops_scored': p['hoops_scored'],
-                        'hoops_conceded': p['hoops_conceded'],
-                        'net_hoops': p['net_hoops'],
-                        'points': p['score'],
-                        'win_percentage': (p['wins'] / p['games_played'] * 100) if p['games_played'] > 0 else 0.00
-                    } for i, p in enumerate(sorted_players)
-                ]
-                standings_history.append(standings_this)
+                update_standings = st.form_submit_button(f"Save Round {edit_round} Results")
                 
-                conn_temp = get_conn()
-                conn_temp.execute(
-                    "UPDATE tournaments SET players=?, matches=?, standings=? WHERE id=?",
-                    (str(players), str(edited_matches), str(standings_history), selected_id)
-                )
-                conn_temp.commit()
-                conn_temp.close()
-                
-                st.success("Standings updated based on edited match results!")
-                st.rerun()
+                if update_standings:
+                    conn_temp = get_conn()
+                    try:
+                        changed = storage.edit_results(conn_temp, selected_id, edited_matches, round_matches)
+                    except ValueError as exc:
+                        st.error(str(exc))
+                        st.stop()
+                    st.session_state.pop(shown_key)
+                    if not changed:
+                        st.info("No results changed.")
+                        st.stop()
+                    
+                    st.success("Standings updated based on edited match results!")
+                    st.rerun()
 
 if selected_id != 0:
+    if st.sidebar.button("Export Backup"):
+        conn_temp = get_conn()
+        backup = storage.export_state(conn_temp, selected_id)
+        st.sidebar.download_button("Download Backup", backup, f"tournament_{selected_id}.ctm", "application/octet-stream")
     if st.sidebar.button("Delete Tournament"):
         conn_temp = get_conn()
-        conn_temp.execute("DELETE FROM tournaments WHERE id=?", (selected_id,))
-        conn_temp.commit()
-        conn_temp.close()
+        storage.delete_tournament(conn_temp, selected_id)
+        get_cache().discard(selected_id)
+        get_export_cache().discard(selected_id)
         st.session_state.selected_id = 0
-        if 'current_pairings' in st.session_state:
-            del st.session_state.current_pairings
-            del st.session_state.current_byes
-            del st.session_state.has_repeat
-            del st.session_state.current_round
         st.sidebar.success("Tournament deleted!")
-        st.rerun()
\ No newline at end of file
+        st.rerun()
+
+if not tournament_list.empty:
+    with st.sidebar.expander("Archive export"):
+        archive_table = st.selectbox("Table:", ['matches', 'standings', 'byes'], key="archive_table")
+        archive_ids = st.multiselect(
+            "Tournaments (none = all):",
+            options=list(tournament_list['id']),
+            format_func=lambda x: tournament_list[tournament_list['id'] == x]['name'].iloc[0],
+            key="archive_ids"
+        )
+        archive_gzip = st.checkbox("gzip", value=True, key="archive_gzip")
+        if st.button("Build Archive"):
+            # Rows are read and compressed in chunks; only the finished file is held for download.
+            archive = BytesIO()
+            export_archive(get_conn(), archive_table, archive, archive_ids or None, compress=archive_gzip)
+            filename = f"{archive_table}.csv.gz" if archive_gzip else f"{archive_table}.csv"
+            st.download_button("Download Archive", archive.getvalue(), filename, "application/gzip" if archive_gzip else "text/csv")
+
+    with st.sidebar.expander("Batch export"):
+        batch_ids = st.multiselect(
+            "Tournaments (none = all):",
+            options=list(tournament_list['id']),
+            format_func=lambda x: tournament_list[tournament_list['id'] == x]['name'].iloc[0],
+            key="batch_ids"
+        )
+        if st.button("Build ZIP"):
+            bar = st.progress(0.0, text="Exporting tournaments...")
+            archive = BytesIO()
+            count = export_batch(
+                storage.DB_PATH, archive, batch_ids or None,
+                progress=lambda done, total: bar.progress(done / total, text=f"{done}/{total} tournaments")
+            )
+            st.download_button("Download ZIP", archive.getvalue(), "tournaments.zip", "application/zip")
+            st.caption(f"{count} tournament(s) exported.")
+
+with st.sidebar.expander("Cache statistics"):
+    cache_stats = get_cache().stats()
+    st.write(f"Hits: {cache_stats['hits']}  \nMisses: {cache_stats['misses']}  \nCached tournaments: {cache_stats['tournaments']}")
+    export_stats = get_export_cache().stats()
+    st.write(
+        f"Export hits: {export_stats['hits']}  \nExport misses: {export_stats['misses']}  \n"
+        f"Cached exports: {export_stats['entries']} ({export_stats['bytes'] / 1024:.0f} KiB)"
+    )
+
+with st.sidebar.expander("Debug timing"):
+    show_timing = st.checkbox("Show timing of recent reruns", key="show_timing")
+    if st.button("Profile next rerun"):
+        st.session_state.profile_next_rerun = True
+        st.rerun()
+
+get_timings().add(timer.finish())
+if timer.profile_path:
+    with open(timer.profile_path, 'rb') as f:
+        st.sidebar.download_button("Download profile", f.read(), os.path.basename(timer.profile_path))
+if show_timing:
+    records = get_timings().records()
+    if records:
+        df_timing = pd.json_normalize(list(reversed(records)))
+        df_timing.columns = [c.replace('spans_ms.', '') for c in df_timing.columns]
+        st.sidebar.dataframe(df_timing, use_container_width=True, hide_index=True)
\ No newline at end of file
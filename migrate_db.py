@@ -0,0 +1,13 @@
+import sys
+
+from croquet import storage
+
+def migrate_db(path=storage.DB_PATH):
+    conn = storage.connect(path)
+    storage.init_db(conn)
+    converted = storage.migrate_legacy(conn)
+    conn.close()
+    print(f"Migrated {converted} tournament(s) in '{path}' to the relational schema.")
+
+if __name__ == "__main__":
+    migrate_db(*sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,31 @@
+import io
+
+import pytest
+
+from croquet import storage
+from croquet.importer import build_tournament, import_files
+
+
+def _match(round_num, p1, p2):
+    return {'round': round_num, 'player1': p1, 'player2': p2, 'score1': 7, 'score2': 3}
+
+
+def test_odd_field_gives_the_missing_player_the_bye():
+    tourney = build_tournament('t', ['A', 'B', 'C'], [_match(1, 'A', 'B'), _match(2, 'A', 'C')])
+    assert tourney['byes'] == {1: ['C'], 2: ['B']}
+
+
+@pytest.mark.parametrize('players', [['A', 'B', 'C', 'D'], ['A', 'B', 'C', 'D', 'E']])
+def test_round_with_unplayed_players_is_rejected(players):
+    with pytest.raises(ValueError, match='Round 1'):
+        build_tournament('t', players, [_match(1, 'A', 'B')])
+
+
+def test_results_file_without_rows_is_rejected():
+    conn = storage.connect(':memory:')
+    storage.init_db(conn)
+    results = io.BytesIO(b"tournament,round,player1,player2,score1,score2\n")
+    with pytest.raises(ValueError, match='no results'):
+        import_files(conn, results=results, results_filename='results.csv')
+    assert storage.list_tournaments(conn) == []
+    conn.close()
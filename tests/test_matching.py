@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from croquet.matching import max_weight_matching
+
+
+def _matchings(vertices, adjacent):
+    """Every matching (as a list of edges) of the given vertices."""
+    if not vertices:
+        yield []
+        return
+    v, rest = vertices[0], vertices[1:]
+    yield from _matchings(rest, adjacent)
+    for u in rest:
+        if (v, u) in adjacent:
+            remaining = [w for w in rest if w != u]
+            for m in _matchings(remaining, adjacent):
+                yield [(v, u)] + m
+
+
+def _brute_force(n, edges, maxcardinality):
+    weight = {}
+    for i, j, w in edges:
+        weight[(i, j)] = weight[(j, i)] = w
+    best = None
+    for m in _matchings(list(range(n)), weight):
+        key = (len(m), sum(weight[e] for e in m)) if maxcardinality else (sum(weight[e] for e in m),)
+        best = key if best is None or key > best else best
+    return best
+
+
+def _score(edges, mate, maxcardinality):
+    weight = {(i, j): w for i, j, w in edges}
+    weight.update({(j, i): w for i, j, w in edges})
+    pairs = [(v, u) for v, u in enumerate(mate) if u > v]
+    for v, u in pairs:
+        assert mate[u] == v and (v, u) in weight
+    total = sum(weight[p] for p in pairs)
+    return (len(pairs), total) if maxcardinality else (total,)
+
+
+@pytest.mark.parametrize('maxcardinality', [False, True])
+def test_matches_brute_force_on_random_graphs(maxcardinality):
+    rng = random.Random(7)
+    for _ in range(300):
+        n = rng.randint(2, 9)
+        edges = [
+            (i, j, rng.randint(-5, 20))
+            for i in range(n) for j in range(i + 1, n) if rng.random() < 0.6
+        ]
+        if not edges:
+            continue
+        mate = max_weight_matching(edges, maxcardinality=maxcardinality)
+        mate += [-1] * (n - len(mate))
+        assert _score(edges, mate, maxcardinality) == _brute_force(n, edges, maxcardinality)
+
+
+def test_empty_graph():
+    assert max_weight_matching([]) == []
@@ -0,0 +1,58 @@
+import itertools
+import random
+
+from croquet.engine import search_pairings
+from croquet.players import PlayerStore
+
+
+def _store(scores, met=()):
+    players = PlayerStore([chr(ord('A') + i) for i in range(len(scores))])
+    for i, score in enumerate(scores):
+        players.score[i] = score
+    for p1, p2 in met:
+        players.record_pairing(p1, p2)
+    return players
+
+
+def _key(players, pairings, byes):
+    """(repeats, bye rank, sum of squared rank gaps), the order pairings are compared in."""
+    rank = {players.names[i]: r for r, i in enumerate(players.ranking())}
+    repeats = sum(p2 in players.opponents[players.index[p1]] for p1, p2 in pairings)
+    bye = rank[byes[0]] if byes else 0
+    return repeats, bye, sum((rank[p1] - rank[p2]) ** 2 for p1, p2 in pairings)
+
+
+def _all_pairings(names):
+    if len(names) % 2:
+        for bye in names:
+            for pairs in _all_pairings([n for n in names if n != bye]):
+                yield pairs[0], [bye]
+        return
+    if not names:
+        yield [], []
+        return
+    first, rest = names[0], names[1:]
+    for partner in rest:
+        for pairs, _ in _all_pairings([n for n in rest if n != partner]):
+            yield [(first, partner)] + pairs, []
+
+
+def test_bye_goes_to_highest_ranked_player_keeping_field_repeat_free():
+    players = _store([2, 1, 1, 0, 0], met=[('B', 'C')])
+    pairings, byes, has_repeat, _ = search_pairings(players)
+    assert byes == ['A']
+    assert not has_repeat
+
+
+def test_pairing_is_cheapest_against_brute_force():
+    rng = random.Random(11)
+    for _ in range(300):
+        n = rng.randint(2, 9)
+        players = _store([rng.randint(0, 3) for _ in range(n)])
+        for p1, p2 in itertools.combinations(players.names, 2):
+            if rng.random() < 0.35:
+                players.record_pairing(p1, p2)
+        pairings, byes, _, info = search_pairings(players)
+        assert info['optimal']
+        best = min(_key(players, p, b) for p, b in _all_pairings(list(players.names)))
+        assert _key(players, pairings, byes) == best
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+from croquet import storage
+from croquet.server import SnapshotStore, Unavailable
+
+
+def _legacy_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tournaments (id INTEGER PRIMARY KEY, name TEXT, created_date TEXT, players TEXT, "
+        "num_rounds INTEGER, current_round INTEGER DEFAULT 1, matches TEXT, standings TEXT, byes TEXT)"
+    )
+    conn.execute("INSERT INTO tournaments VALUES (1, 'Old', '2020-01-01', '[]', 3, 1, '[]', '[]', '[]')")
+    conn.commit()
+    conn.close()
+
+
+def test_old_schema_is_unavailable_and_left_untouched(tmp_path):
+    path = tmp_path / 'old.db'
+    _legacy_db(path)
+    before = path.read_bytes()
+    store = SnapshotStore(str(path))
+    with pytest.raises(Unavailable):
+        store.body()
+    with pytest.raises(Unavailable):
+        store.body(1)
+    store.close()
+    assert path.read_bytes() == before
+
+
+def test_unconverted_tournament_is_unavailable_until_the_app_loads_it(tmp_path):
+    path = tmp_path / 'old.db'
+    _legacy_db(path)
+    conn = storage.connect(str(path))
+    storage.init_db(conn)
+    store = SnapshotStore(str(path))
+    assert store.body() is not None
+    with pytest.raises(Unavailable):
+        store.etag(1)
+    storage.load_tournament(conn, 1)
+    etag, _ = store.body(1)
+    assert etag == store.etag(1)
+    assert store.body(2) is None
+    store.close()
+    conn.close()
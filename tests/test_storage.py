@@ -0,0 +1,228 @@
+import sqlite3
+import threading
+
+import pytest
+
+from croquet import storage
+from croquet.engine import build_standings, replay_matches
+from croquet.players import PlayerStore
+
+NAMES = ['A', 'B', 'C', 'D']
+ROUNDS = [
+    [('A', 'B', 7, 3), ('C', 'D', 7, 5)],
+    [('A', 'C', 7, 6), ('B', 'D', 2, 7)],
+]
+
+
+@pytest.fixture
+def conn():
+    conn = storage.connect(':memory:')
+    storage.init_db(conn)
+    yield conn
+    conn.close()
+
+
+def _scores(matches):
+    return [(m['round'], m['player1'], m['player2'], m['score1'], m['score2']) for m in matches]
+
+
+def _store(conn):
+    tournament_id = storage.create_tournament(conn, "T", "2024-01-01T00:00:00", 3, NAMES)
+    players = PlayerStore(NAMES)
+    for round_num, games in enumerate(ROUNDS, 1):
+        matches = [{'round': round_num, 'player1': p1, 'player2': p2, 'score1': s1, 'score2': s2}
+                   for p1, p2, s1, s2 in games]
+        replay_matches(players, matches)
+        storage.record_round(conn, tournament_id, round_num, matches, [], build_standings(players))
+    return tournament_id
+
+
+def test_edit_results_replays_later_rounds(conn):
+    tournament_id = _store(conn)
+    edited = storage.load_matches(conn, tournament_id)
+    edited[0].update(score1=3, score2=7)
+    assert storage.edit_results(conn, tournament_id, edited) == 1
+    assert _scores(storage.load_matches(conn, tournament_id)) == _scores(edited)
+    players = PlayerStore(NAMES)
+    replay_matches(players, edited)
+    assert storage.load_standings(conn, tournament_id) == build_standings(players)
+
+
+def test_edit_results_rejects_a_game_never_played(conn):
+    tournament_id = _store(conn)
+    version = storage.tournament_version(conn, tournament_id)
+    game = {'round': 1, 'player1': 'A', 'player2': 'D', 'score1': 7, 'score2': 0}
+    with pytest.raises(ValueError, match='no game'):
+        storage.edit_results(conn, tournament_id, [game])
+    assert storage.tournament_version(conn, tournament_id) == version
+
+
+def test_stale_form_keeps_the_other_editors_changes(conn):
+    tournament_id = _store(conn)
+    shown_a = storage.load_matches(conn, tournament_id, 1)
+    shown_b = storage.load_matches(conn, tournament_id, 1)
+    form_a = [dict(m) for m in shown_a]
+    form_a[0].update(score1=3, score2=7)
+    assert storage.edit_results(conn, tournament_id, form_a, shown_a) == 1
+    form_b = [dict(m) for m in shown_b]
+    form_b[1].update(score1=7, score2=0)
+    assert storage.edit_results(conn, tournament_id, form_b, shown_b) == 1
+    assert _scores(storage.load_matches(conn, tournament_id, 1)) == [(1, 'A', 'B', 3, 7), (1, 'C', 'D', 7, 0)]
+
+
+def test_stale_form_editing_the_same_game_conflicts(conn):
+    tournament_id = _store(conn)
+    shown_a = storage.load_matches(conn, tournament_id, 1)
+    shown_b = storage.load_matches(conn, tournament_id, 1)
+    form_a = [dict(m) for m in shown_a]
+    form_a[0].update(score1=3, score2=7)
+    storage.edit_results(conn, tournament_id, form_a, shown_a)
+    version = storage.tournament_version(conn, tournament_id)
+    form_b = [dict(m) for m in shown_b]
+    form_b[0].update(score1=7, score2=6)
+    form_b[1].update(score1=7, score2=0)
+    with pytest.raises(storage.ResultConflict):
+        storage.edit_results(conn, tournament_id, form_b, shown_b)
+    assert _scores(storage.load_matches(conn, tournament_id, 1)) == [(1, 'A', 'B', 3, 7), (1, 'C', 'D', 7, 5)]
+    assert storage.tournament_version(conn, tournament_id) == version
+
+
+def _paired(conn):
+    tournament_id = storage.create_tournament(conn, "T", "2024-01-01T00:00:00", 3, NAMES)
+    storage.ensure_pairings(conn, tournament_id, storage.load_players(conn, tournament_id), 1)
+    return tournament_id
+
+
+def test_round_advances_only_after_the_last_board(conn):
+    tournament_id = _paired(conn)
+    assert storage.record_result(conn, tournament_id, 1, 1, 7, 3, expected_version=0) is False
+    assert storage.load_tournament(conn, tournament_id)['current_round'] == 1
+    assert storage.record_result(conn, tournament_id, 1, 1, 7, 4, expected_version=1) is False
+    assert storage.record_result(conn, tournament_id, 1, 2, 2, 7, expected_version=0) is True
+    assert storage.load_tournament(conn, tournament_id)['current_round'] == 2
+    assert [(m['score1'], m['score2']) for m in storage.load_matches(conn, tournament_id)] == [(7, 4), (2, 7)]
+    assert len(storage.load_standings(conn, tournament_id, 1)) == len(NAMES)
+    with pytest.raises(ValueError, match='not a game of the current round'):
+        storage.record_result(conn, tournament_id, 1, 1, 7, 0)
+
+
+@pytest.mark.parametrize('expected_version', [1, 2])
+def test_stale_board_version_conflicts(conn, expected_version):
+    tournament_id = _paired(conn)
+    if expected_version == 2:
+        storage.record_result(conn, tournament_id, 1, 1, 7, 3)
+    with pytest.raises(storage.ResultConflict, match='Board 1'):
+        storage.record_result(conn, tournament_id, 1, 1, 7, 0, expected_version=expected_version)
+
+
+def test_lost_race_is_retried(tmp_path, monkeypatch):
+    path = str(tmp_path / 't.db')
+    conn = storage.connect(path)
+    storage.init_db(conn)
+    other = storage.connect(path)
+    tournament_id = _paired(conn)
+    load_board_results = storage.load_board_results
+    calls = []
+
+    def racing(conn, tournament_id, round_num):
+        # Another scorer saves the board between this call's read and its write.
+        results = load_board_results(conn, tournament_id, round_num)
+        if not calls:
+            calls.append(round_num)
+            monkeypatch.setattr(storage, 'load_board_results', load_board_results)
+            storage.record_result(other, tournament_id, round_num, 1, 3, 7)
+        return results
+
+    monkeypatch.setattr(storage, 'load_board_results', racing)
+    storage.record_result(conn, tournament_id, 1, 1, 7, 5)
+    assert storage.load_board_results(conn, tournament_id, 1)[1]['score1'] == 7
+    assert storage.load_board_results(conn, tournament_id, 1)[1]['version'] == 2
+    other.close()
+    conn.close()
+
+
+def _legacy_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tournaments (id INTEGER PRIMARY KEY, name TEXT, created_date TEXT, players TEXT, "
+        "num_rounds INTEGER, current_round INTEGER DEFAULT 1, matches TEXT, standings TEXT, byes TEXT)"
+    )
+    players = repr([{'name': name} for name in NAMES])
+    matches = repr([{'round': 1, 'player1': p1, 'player2': p2, 'score1': s1, 'score2': s2}
+                    for p1, p2, s1, s2 in ROUNDS[0]])
+    conn.execute("INSERT INTO tournaments VALUES (1, 'Old', '2020-01-01', ?, 3, 2, ?, '[]', '[[], []]')",
+                 (players, matches))
+    conn.commit()
+    conn.close()
+
+
+def test_concurrent_migrations_convert_once(tmp_path):
+    path = str(tmp_path / 'old.db')
+    _legacy_db(path)
+    setup = storage.connect(path)
+    storage.init_db(setup)
+    setup.close()
+    barrier = threading.Barrier(2)
+    converted, errors = [], []
+
+    def migrate():
+        conn = storage.connect(path)
+        try:
+            barrier.wait()
+            converted.append(storage.migrate_legacy(conn, 1))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=migrate) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert sorted(converted) == [0, 1]
+    conn = storage.connect(path)
+    assert storage.load_player_names(conn, 1) == NAMES
+    assert len(storage.load_matches(conn, 1)) == 2
+    conn.close()
+
+
+def test_pool_hands_a_finished_threads_connection_to_the_next(tmp_path):
+    pool = storage.ConnectionPool(str(tmp_path / 'p.db'), size=2)
+    seen = []
+
+    def use():
+        seen.append(pool.connection())
+        assert pool.connection() is seen[-1]
+
+    for _ in range(3):
+        thread = threading.Thread(target=use)
+        thread.start()
+        thread.join()
+    assert seen[0] is seen[1] is seen[2]
+    pool.close_all()
+
+
+def test_pool_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'BUSY_TIMEOUT_MS', 50)
+    pool = storage.ConnectionPool(str(tmp_path / 'p.db'), size=1)
+    held = pool.connection()
+    errors, got = [], []
+
+    def use():
+        try:
+            got.append(pool.connection())
+        except sqlite3.OperationalError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=use)
+    thread.start()
+    thread.join()
+    assert len(errors) == 1 and got == []
+    pool.release()
+    thread = threading.Thread(target=use)
+    thread.start()
+    thread.join()
+    assert got == [held]
+    pool.close_all()